@@ -0,0 +1,115 @@
+"""
+Benchmark das transformações vetorizadas de src/data.py (Tipo pelo Segmento e datas de
+referência dos comunicados) contra as versões linha a linha usadas anteriormente, conferindo que
+os resultados são iguais nos dados atuais e em dados sintéticos 100x maiores.
+
+Uso:
+    python3 benchmarks/data_benchmark.py
+"""
+
+import re
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.offsets import MonthEnd
+
+from config.settings import COMMUNICATIONS_FILE, INVESTIDOR10_FILE
+from src.data import TYPE_BY_SEGMENT, map_type_by_segment, parse_reference_dates
+from src.utils.data_version import get_current_version, resolve_data_file
+
+SCALE = 100
+
+# Formatos de datas de referência encontrados no FNET, com os raros fora do padrão
+DATE_FORMATS = ["%d/%m/%Y", "%m/%Y", "%Y-%m-%d"]
+DATE_FORMAT_WEIGHTS = [0.6, 0.39, 0.01]
+
+
+def loop_type_by_segment(df: pd.DataFrame) -> pd.Series:
+    """Cálculo anterior: um `apply` por linha."""
+    return df.apply(lambda row: TYPE_BY_SEGMENT.get(row["Segmento"], row["Tipo"]), axis=1)
+
+
+def loop_reference_dates(values: pd.Series) -> pd.Series:
+    """Cálculo anterior: `re.fullmatch` e `pd.to_datetime` em cada valor."""
+
+    def parse_data_referencia(value):
+        value = str(value).strip()
+        # Se for do tipo "mm/yyyy", aplica tratamento especial
+        if re.fullmatch(r"\d{2}/\d{4}", value):
+            return pd.to_datetime(value, format="%m/%Y") + MonthEnd(1)
+        else:
+            return pd.to_datetime(value, dayfirst=True)
+
+    return values.apply(parse_data_referencia)
+
+
+def make_fiis(n_fiis: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Segmentos e tipos sintéticos, incluindo segmentos fora de TYPE_BY_SEGMENT."""
+    segments = [*TYPE_BY_SEGMENT, "Títulos e Val. Mob.", "Outros", "Híbrido"]
+    return pd.DataFrame(
+        {
+            "Segmento": rng.choice(segments, n_fiis),
+            "Tipo": rng.choice(["Fundo de Papel", "Fundo de Tijolo", "Híbrido", None], n_fiis),
+        }
+    )
+
+
+def make_reference_dates(n_dates: int, rng: np.random.Generator) -> pd.Series:
+    """Datas de referência sintéticas como texto, nos formatos de DATE_FORMATS."""
+    dates = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 4000, n_dates), "D")
+    formats = rng.choice(DATE_FORMATS, n_dates, p=DATE_FORMAT_WEIGHTS)
+    return pd.Series([date.strftime(fmt) for date, fmt in zip(dates, formats)])
+
+
+def timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def compare(name: str, loop_func, vector_func, data) -> None:
+    loop_time, expected = timed(loop_func, data)
+    vector_time, result = timed(vector_func, data)
+
+    # Os dois cálculos devem chegar aos mesmos valores
+    pd.testing.assert_series_equal(
+        pd.Series(result, dtype=object),
+        pd.Series(expected, dtype=object),
+        check_names=False,
+        check_index=False,
+    )
+
+    print(
+        f"{name:<28} {len(data):>8} {loop_time:>12.4f} {vector_time:>16.4f} "
+        f"{loop_time / vector_time:>7.0f}x"
+    )
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    version = get_current_version()
+
+    fiis = pd.read_csv(resolve_data_file(INVESTIDOR10_FILE, version))[["Segmento", "Tipo"]]
+    communications = pd.read_csv(resolve_data_file(COMMUNICATIONS_FILE, version))
+    reference_dates = communications["Data de Referência"]
+
+    print(
+        f"{'Transformação':<28} {'Linhas':>8} {'Loops (s)':>12} {'Vetorizado (s)':>16} {'Ganho':>8}"
+    )
+    compare("Tipo (dados atuais)", loop_type_by_segment, map_type_by_segment, fiis)
+    compare(
+        f"Tipo (sintético {SCALE}x)",
+        loop_type_by_segment,
+        map_type_by_segment,
+        make_fiis(len(fiis) * SCALE, rng),
+    )
+    compare(
+        "Referência (dados atuais)", loop_reference_dates, parse_reference_dates, reference_dates
+    )
+    compare(
+        f"Referência (sintético {SCALE}x)",
+        loop_reference_dates,
+        parse_reference_dates,
+        make_reference_dates(len(reference_dates) * SCALE, rng),
+    )
@@ -0,0 +1,109 @@
+"""
+Benchmark das consultas ao histórico (src/history.py) em um histórico sintético, comparando
+`get_history`, que lê apenas os snapshots a partir do último checkpoint antes do início, com a
+leitura de todos os snapshots. Os períodos incluem um início no mesmo dia, mas antes, do checkpoint
+do mês, em que o estado anterior ao início está apenas nos snapshots do mês anterior.
+
+Uso:
+    python3 benchmarks/history_benchmark.py
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import src.history as history
+from src.history import REMOVED_COL, SNAPSHOT_DATE_COL, get_history, save_snapshot
+
+N_FIIS = 500
+START = datetime(2026, 8, 1)
+DAYS = 90
+# Horários dos scrapes em cada dia: o primeiro scrape do mês vira o checkpoint, às 10h
+RUN_HOURS = [10, 18]
+CHANGED_FRACTION = 0.05
+
+PERIODS = [
+    ("2026-10-01", None),
+    ("2026-10-01 12:00", "2026-10-15"),
+    ("2026-09-15", "2026-09-30"),
+    (None, "2026-08-20"),
+]
+
+
+def make_history(rng: np.random.Generator) -> None:
+    """Guarda no histórico scrapes sintéticos, com mudanças e FIIs que saem e voltam."""
+    tickers = np.array([f"F{i:04d}11" for i in range(N_FIIS)])
+    data = pd.DataFrame(
+        {
+            "Ticker": tickers,
+            "Cotação": rng.uniform(5, 150, N_FIIS).round(2),
+            "Dividend Yield": rng.uniform(0, 15, N_FIIS).round(2),
+        }
+    )
+
+    for day in range(DAYS):
+        for hour in RUN_HOURS:
+            changed = rng.random(N_FIIS) < CHANGED_FRACTION
+            data.loc[changed, "Cotação"] = rng.uniform(5, 150, changed.sum()).round(2)
+            listed = rng.random(N_FIIS) > 0.01
+            taken_at = START + timedelta(days=day, hours=hour)
+            save_snapshot(data[listed], "benchmark", taken_at=taken_at)
+
+
+def read_all(start: str | None, end: str | None) -> pd.DataFrame:
+    """Consulta de referência: lê todos os snapshots e aplica o mesmo período."""
+    source_dir = os.path.join(history.HISTORY_DIR, "benchmark")
+    paths = [
+        os.path.join(root, name)
+        for root, _, files in os.walk(source_dir)
+        for name in files
+        if name.endswith(".parquet") and name != history.LATEST_FILE
+    ]
+    all_rows = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+    all_rows = all_rows.sort_values(SNAPSHOT_DATE_COL, kind="stable")
+
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    if end is not None and end == end.normalize():
+        end = end + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    if end is not None:
+        all_rows = all_rows[all_rows[SNAPSHOT_DATE_COL] <= end]
+    if start is not None:
+        before = all_rows[all_rows[SNAPSHOT_DATE_COL] < start].groupby("Ticker").tail(1)
+        before = before[~before[REMOVED_COL]]
+        all_rows = pd.concat([before, all_rows[all_rows[SNAPSHOT_DATE_COL] >= start]])
+
+    return all_rows.sort_values(["Ticker", SNAPSHOT_DATE_COL]).reset_index(drop=True)
+
+
+def timed(func, *args, **kwargs) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+
+    with tempfile.TemporaryDirectory() as history_dir:
+        history.HISTORY_DIR = history_dir
+        history.logging.disable(history.logging.INFO)
+        make_history(rng)
+
+        print(f"{'Período':<40} {'Linhas':>8} {'Tudo (s)':>10} {'Checkpoint (s)':>16}")
+        for start, end in PERIODS:
+            all_time, expected = timed(read_all, start, end)
+            history_time, result = timed(get_history, start=start, end=end, source="benchmark")
+
+            # As duas consultas devem trazer as mesmas linhas
+            pd.testing.assert_frame_equal(result[expected.columns], expected)
+
+            print(
+                f"{f'{start} a {end}':<40} {len(result):>8} {all_time:>10.4f} "
+                f"{history_time:>16.4f}"
+            )
@@ -0,0 +1,168 @@
+"""
+Benchmark da análise da carteira (src/portfolio.py) contra os loops por FII usados anteriormente
+na página de Distribuição, com carteiras sintéticas de milhares de posições, e da análise em lote
+de várias carteiras contra um recálculo por carteira.
+
+Uso:
+    python3 benchmarks/portfolio_benchmark.py
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DEFAULT_PORTFOLIO
+from src.portfolio import (
+    POSITION_COLUMNS,
+    get_portfolios_summary,
+    get_segment_exposure,
+    join_portfolios,
+)
+
+SEGMENTS = ["Logística", "Lajes Corporativas", "Shoppings", "Papel", "Renda Urbana", "Outros"]
+
+
+def make_market(n_fiis: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Dados de mercado sintéticos, com os mesmos tipos de `get_fiis_data`."""
+    return pd.DataFrame(
+        {
+            "Ticker": pd.Categorical([f"F{i:05d}11" for i in range(n_fiis)]),
+            "Segmento": pd.Categorical(rng.choice(SEGMENTS, n_fiis)),
+            "Cotação": rng.uniform(5, 150, n_fiis),
+            "Dividend Yield": rng.uniform(0, 18, n_fiis).astype("float32"),
+            "Último Yield": rng.uniform(0, 2, n_fiis).astype("float32"),
+        }
+    )
+
+
+def loop_reference(quantities: dict[str, int], df: pd.DataFrame) -> tuple[dict, dict]:
+    """Cálculo anterior da página: uma varredura de `df` por FII em cada métrica."""
+    active_fiis = {ticker: qty for ticker, qty in quantities.items() if qty > 0}
+
+    total_investido = sum(
+        qty * df[df["Ticker"] == ticker].iloc[0]["Cotação"]
+        for ticker, qty in active_fiis.items()
+        if not df[df["Ticker"] == ticker].empty
+    )
+
+    dy_ponderado = 0
+    ultimo_yield_ponderado = 0
+    segmento_data = {}
+    for ticker, qty in active_fiis.items():
+        fii_data = df[df["Ticker"] == ticker]
+        if not fii_data.empty:
+            valor_fii = qty * fii_data.iloc[0]["Cotação"]
+            peso = valor_fii / total_investido
+            dy_ponderado += peso * fii_data.iloc[0]["Dividend Yield"]
+            ultimo_yield_ponderado += peso * fii_data.iloc[0]["Último Yield"]
+
+            segmento = fii_data.iloc[0]["Segmento"]
+            segmento_data[segmento] = segmento_data.get(segmento, 0) + valor_fii
+
+    summary = {
+        "Total Investido": total_investido,
+        "DY Médio Ponderado": dy_ponderado,
+        "Último Yield Ponderado": ultimo_yield_ponderado,
+    }
+    return summary, segmento_data
+
+
+def vectorized(quantities: dict[str, int], df: pd.DataFrame) -> tuple[dict, pd.DataFrame]:
+    """Cálculo da página para uma carteira, com as posições no formato de `load_positions`."""
+    positions = pd.DataFrame(
+        {
+            "Carteira": pd.Categorical([DEFAULT_PORTFOLIO] * len(quantities)),
+            "Ticker": list(quantities.keys()),
+            "Quantidade": list(quantities.values()),
+            "Preço Médio": np.nan,
+        }
+    )
+    positions = positions[positions["Quantidade"] > 0]
+    summaries, segments = batched(positions, df)
+    return summaries.loc[DEFAULT_PORTFOLIO].to_dict(), segments
+
+
+def make_portfolios(
+    n_portfolios: int, n_positions: int, market: pd.DataFrame, rng: np.random.Generator
+) -> pd.DataFrame:
+    """Tabela de posições sintética, no formato de `load_positions`."""
+    tickers = market["Ticker"].astype(str).to_numpy()
+    frames = [
+        pd.DataFrame(
+            {
+                "Carteira": f"Carteira {i}",
+                "Ticker": rng.choice(tickers, n_positions, replace=False),
+                "Quantidade": rng.integers(1, 500, n_positions),
+                "Preço Médio": rng.uniform(5, 150, n_positions),
+            }
+        )
+        for i in range(n_portfolios)
+    ]
+    positions = pd.concat(frames, ignore_index=True)[POSITION_COLUMNS]
+    positions["Carteira"] = pd.Categorical(
+        positions["Carteira"], categories=positions["Carteira"].unique()
+    )
+    return positions
+
+
+def per_portfolio(positions: pd.DataFrame, df: pd.DataFrame) -> dict[str, dict]:
+    """Recálculo por carteira, chamando a análise para cada carteira separadamente."""
+    summaries = {}
+    for carteira, group in positions.groupby("Carteira", observed=True):
+        summaries[carteira] = batched(group, df)[0].loc[carteira].to_dict()
+    return summaries
+
+
+def batched(positions: pd.DataFrame, df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    joined = join_portfolios(positions, df)
+    return get_portfolios_summary(positions, joined), get_segment_exposure(joined)
+
+
+def timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    market = make_market(20_000, rng)
+
+    print(f"{'Posições':>10} {'Loops (s)':>12} {'Vetorizado (s)':>16} {'Ganho':>8}")
+    for n_positions in [100, 1_000, 5_000]:
+        tickers = rng.choice(market["Ticker"].astype(str), n_positions, replace=False)
+        quantities = {
+            ticker: int(qty) for ticker, qty in zip(tickers, rng.integers(0, 500, n_positions))
+        }
+
+        loop_time, (loop_summary, loop_segments) = timed(loop_reference, quantities, market)
+        vector_time, (summary, segments) = timed(vectorized, quantities, market)
+
+        # Os dois cálculos devem chegar aos mesmos valores
+        for key, value in loop_summary.items():
+            assert np.isclose(summary[key], value), key
+        for segmento, valor in loop_segments.items():
+            assert np.isclose(segments.set_index("Segmento").loc[segmento, "Valor Total"], valor)
+
+        print(
+            f"{n_positions:>10} {loop_time:>12.4f} {vector_time:>16.4f} "
+            f"{loop_time / vector_time:>7.0f}x"
+        )
+
+    print()
+    print(f"{'Carteiras':>10} {'Por carteira (s)':>18} {'Em lote (s)':>13} {'Ganho':>8}")
+    for n_portfolios in [10, 50, 200]:
+        positions = make_portfolios(n_portfolios, 50, market, rng)
+
+        loop_time, loop_summaries = timed(per_portfolio, positions, market)
+        batch_time, (summaries, _) = timed(batched, positions, market)
+
+        for carteira, loop_summary in loop_summaries.items():
+            for key, value in loop_summary.items():
+                assert np.isclose(summaries.loc[carteira, key], value), (carteira, key)
+
+        print(
+            f"{n_portfolios:>10} {loop_time:>18.4f} {batch_time:>13.4f} "
+            f"{loop_time / batch_time:>7.0f}x"
+        )
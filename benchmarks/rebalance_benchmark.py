@@ -0,0 +1,67 @@
+"""
+Benchmark do cálculo de rebalanceamento (src/rebalance.py) com carteiras sintéticas, comparando a
+solução com a busca exaustiva em carteiras pequenas e medindo o tempo em carteiras grandes.
+
+Uso:
+    python3 benchmarks/rebalance_benchmark.py
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+from src.rebalance import solve_purchases
+
+
+def make_portfolio(n_fiis: int, cash: float, rng: np.random.Generator) -> tuple:
+    """Cotações, valores atuais e valores alvo sintéticos."""
+    prices = rng.uniform(5, 150, n_fiis)
+    values = rng.uniform(0, 20_000, n_fiis) * rng.integers(0, 2, n_fiis)
+    targets = rng.dirichlet(np.ones(n_fiis)) * (values.sum() + cash)
+    return prices, values, targets
+
+
+def deviation(quantities, prices, values, targets) -> float:
+    return float(((values + quantities * prices - targets) ** 2).sum())
+
+
+def exhaustive(prices, values, targets, cash) -> float:
+    """Menor desvio possível, testando todas as combinações de compras que cabem no aporte."""
+    ranges = [range(int(cash // price) + 1) for price in prices]
+    return min(
+        deviation(np.array(quantities), prices, values, targets)
+        for quantities in itertools.product(*ranges)
+        if np.dot(quantities, prices) <= cash
+    )
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+
+    optimal = 0
+    n_cases = 300
+    worst_gap = 0.0
+    for _ in range(n_cases):
+        cash = rng.uniform(0, 600)
+        prices, values, targets = make_portfolio(int(rng.integers(2, 5)), cash, rng)
+        quantities = solve_purchases(prices, values, targets, cash)
+        assert quantities @ prices <= cash + 1e-9
+
+        best = exhaustive(prices, values, targets, cash)
+        found = deviation(quantities, prices, values, targets)
+        if found <= best + 1e-6:
+            optimal += 1
+        worst_gap = max(worst_gap, (found - best) / max(best, 1))
+    print(f"Solução ótima em {optimal} de {n_cases} carteiras (pior diferença: {worst_gap:.4%})")
+
+    print(f"{'FIIs':>6} {'Aporte':>12} {'Tempo (s)':>10} {'Sobra':>10}")
+    for n_fiis in [50, 200, 500]:
+        cash = 50_000.0
+        prices, values, targets = make_portfolio(n_fiis, cash, rng)
+
+        start = time.perf_counter()
+        quantities = solve_purchases(prices, values, targets, cash)
+        elapsed = time.perf_counter() - start
+
+        print(f"{n_fiis:>6} {cash:>12,.2f} {elapsed:>10.4f} {cash - quantities @ prices:>10.2f}")
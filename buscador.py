@@ -1,54 +1,40 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from config.settings import (
-    BIG_MONEY_COLS,
-    FLOAT_COLS,
-    INT_COLS,
     INVESTIDOR10_BASE_URL,
-    MONEY_COLS,
-    PERCENT_COLS,
+    RANKING_METHODS,
+    RANKING_WEIGHTS,
+    SEGMENT_QUANTILES,
+    SEGMENT_STATS_COLS,
 )
+from src.communications_store import get_unread_total
 from src.data import get_fiis_data as get_data
+from src.data import get_segment_stats
+from src.screener.engine import screen
+from src.screener.expressions import get_preset_rows
+from src.screener.index import ScreenerIndex, get_screener_index
+from src.screener.ranking import score, top_k
+from src.utils.data_version import get_current_version
+from src.utils.formatting import DISPLAY_FORMATS, get_number_columns
 from src.utils.get_date import get_last_update_date
 from src.utils.get_tickers import get_my_tickers, get_wanted_tickers
 
+# Com copy-on-write, as páginas recebem cópias rasas dos DataFrames do cache de dados
+# (src.utils.cache), compartilhados entre as sessões: alterações copiam apenas as colunas alteradas
+# e nunca chegam ao objeto compartilhado. A opção vale para o processo inteiro do Streamlit.
+pd.set_option("mode.copy_on_write", True)
+
 st.set_page_config(page_title="Buscador", layout="wide")
 
-df = get_data()
+version = get_current_version()
 
 
-# SIDEBAR FILTERS
+# SIDEBAR
 atualizado = get_last_update_date()
 st.sidebar.text(f"Atualizado {atualizado}")
-
-
-st.sidebar.header("Filtros")
-
-
-tickers_list = sorted(df["Ticker"].dropna().unique())
-tickers = st.sidebar.multiselect("Ticker(s)", options=tickers_list, default=None)
-if tickers:
-    df = df[df["Ticker"].isin(tickers)]
-
-
-ordem_personalizada = ["Fundo de Tijolo", "Fundo de Papel"]
-tipos_list = sorted(
-    df["Tipo"].dropna().unique(),
-    key=lambda x: (
-        ordem_personalizada.index(x) if x in ordem_personalizada else len(ordem_personalizada)
-    ),
-)
-
-tipos = st.sidebar.multiselect("Tipo(s)", options=tipos_list, default=None)
-if tipos:
-    df = df[df["Tipo"].isin(tipos)]
-
-
-segmentos_list = sorted(df["Segmento"].dropna().unique())
-segmentos = st.sidebar.multiselect("Segmento(s)", options=segmentos_list, default=None)
-if segmentos:
-    df = df[df["Segmento"].isin(segmentos)]
+st.sidebar.text(f"📬 {get_unread_total()} comunicados não lidos")
 
 
 def numeric_cast(str_value):
@@ -62,121 +48,193 @@ def numeric_cast(str_value):
         return None
 
 
-p_vp_min_str = st.sidebar.text_input("P/VP Mínimo")
-p_vp_max_str = st.sidebar.text_input("P/VP Máximo")
+def filter_rows(version: str | None, index: ScreenerIndex) -> np.ndarray:
+    """Desenha os filtros e retorna as posições das linhas selecionadas."""
+    predicates = []
 
-p_vp_min = numeric_cast(p_vp_min_str)
-p_vp_max = numeric_cast(p_vp_max_str)
+    with st.expander("Filtros", expanded=True):
+        preset_col, tickers_col, tipos_col, segmentos_col = st.columns(4)
 
-if p_vp_min:
-    df = df[df["P/VP"] >= p_vp_min]
-if p_vp_max:
-    df = df[df["P/VP"] <= p_vp_max]
+        preset_rows = get_preset_rows(version)
+        preset = preset_col.selectbox("Preset", options=["Nenhum", *preset_rows])
+        candidates = preset_rows.get(preset)
 
+        tickers_list = sorted(index.unique("Ticker", candidates))
+        tickers = tickers_col.multiselect("Ticker(s)", options=tickers_list, default=None)
+        if tickers:
+            predicates.append(("Ticker", "in", tickers))
 
-dy_min_str = st.sidebar.text_input("Dividend Yield Mínimo")
-dy_max_str = st.sidebar.text_input("Dividend Yield Máximo")
+        ordem_personalizada = ["Fundo de Tijolo", "Fundo de Papel"]
+        tipos_list = sorted(
+            index.unique("Tipo", screen(index, predicates, candidates)),
+            key=lambda x: (
+                ordem_personalizada.index(x)
+                if x in ordem_personalizada
+                else len(ordem_personalizada)
+            ),
+        )
 
-dy_min = numeric_cast(dy_min_str)
-dy_max = numeric_cast(dy_max_str)
+        tipos = tipos_col.multiselect("Tipo(s)", options=tipos_list, default=None)
+        if tipos:
+            predicates.append(("Tipo", "in", tipos))
 
-if dy_min:
-    df = df[df["Dividend Yield"] >= dy_min]
-if dy_max:
-    df = df[df["Dividend Yield"] <= dy_max]
+        segmentos_list = sorted(index.unique("Segmento", screen(index, predicates, candidates)))
+        segmentos = segmentos_col.multiselect("Segmento(s)", options=segmentos_list, default=None)
+        if segmentos:
+            predicates.append(("Segmento", "in", segmentos))
 
+        add_numeric_filters(predicates)
 
-liquidez_min_str = st.sidebar.text_input("Liquidez Diária Mínima (Mil)")
+    return screen(index, predicates, candidates)
 
-liquidez_min = numeric_cast(liquidez_min_str) * 1000 if liquidez_min_str else None
 
-if liquidez_min:
-    df = df[df["Liquidez Diária"] >= liquidez_min]
+def add_numeric_filters(predicates: list[tuple]) -> None:
+    """Desenha os filtros numéricos e de carteira, adicionando os predicados escolhidos."""
+    p_vp_min_col, p_vp_max_col, dy_min_col, dy_max_col, liquidez_col = st.columns(5)
 
+    p_vp_min = numeric_cast(p_vp_min_col.text_input("P/VP Mínimo"))
+    p_vp_max = numeric_cast(p_vp_max_col.text_input("P/VP Máximo"))
 
-st.sidebar.divider()
+    if p_vp_min:
+        predicates.append(("P/VP", ">=", p_vp_min))
+    if p_vp_max:
+        predicates.append(("P/VP", "<=", p_vp_max))
 
+    dy_min = numeric_cast(dy_min_col.text_input("Dividend Yield Mínimo"))
+    dy_max = numeric_cast(dy_max_col.text_input("Dividend Yield Máximo"))
 
-my_tickers = st.sidebar.toggle("Meus FIIs")
-if my_tickers:
-    df = df[df["Ticker"].isin(get_my_tickers())]
+    if dy_min:
+        predicates.append(("Dividend Yield", ">=", dy_min))
+    if dy_max:
+        predicates.append(("Dividend Yield", "<=", dy_max))
 
-wanted_tickers = st.sidebar.toggle("FIIs Desejados")
-if wanted_tickers:
-    df = df[df["Ticker"].isin(get_wanted_tickers())]
+    liquidez_min_str = liquidez_col.text_input("Liquidez Diária Mínima (Mil)")
 
+    liquidez_min = numeric_cast(liquidez_min_str) * 1000 if liquidez_min_str else None
 
-# MAIN TABLE
-st.title(f"{df.shape[0]} FIIs")
+    if liquidez_min:
+        predicates.append(("Liquidez Diária", ">=", liquidez_min))
 
-# Criar coluna com estrela para FIIs que o usuário possui
-my_tickers_set = get_my_tickers()
-df["⭐"] = df["Ticker"].apply(lambda x: "⭐" if x in my_tickers_set else "")
+    my_tickers_col, wanted_tickers_col = st.columns(2)
 
-# Criar coluna Link antes de processar o dataframe
-df["Link"] = df["Ticker"].apply(lambda x: f"{INVESTIDOR10_BASE_URL}{x.lower()}")
+    if my_tickers_col.toggle("Meus FIIs"):
+        predicates.append(("Ticker", "in", get_my_tickers()))
 
-df = df.drop(columns=df.filter(regex="(approved$|rank$)").columns)
-df = df.reset_index(drop=True).reset_index().rename(columns={"index": "Rank"})
-df["Rank"] = df["Rank"] + 1
+    if wanted_tickers_col.toggle("FIIs Desejados"):
+        predicates.append(("Ticker", "in", get_wanted_tickers()))
 
-df = df.drop(columns=["Data Atualização"])
 
-# Garantir que colunas numéricas sejam do tipo numérico (não string)
-# Converter valores de string para numérico se necessário
-for col in PERCENT_COLS + MONEY_COLS + BIG_MONEY_COLS + FLOAT_COLS + INT_COLS:
-    if col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
+def rank_rows(index: ScreenerIndex, rows: np.ndarray) -> np.ndarray:
+    """Desenha as opções de ranking e retorna as linhas ordenadas pela nota."""
+    with st.expander("Ranking"):
+        weight_cols = st.columns(len(RANKING_WEIGHTS))
+        weights = {
+            column: weight_col.number_input(f"Peso {column}", value=weight, step=0.5)
+            for weight_col, (column, weight) in zip(weight_cols, RANKING_WEIGHTS.items())
+        }
 
-# Configurar formatação de colunas para st.dataframe
-column_config = {}
+        method_col, by_segment_col, top_col = st.columns(3)
+        method = method_col.selectbox(
+            "Normalização", options=list(RANKING_METHODS), format_func=RANKING_METHODS.get
+        )
+        by_segment = by_segment_col.toggle("Normalizar por Segmento")
+        top = top_col.number_input("Mostrar os Melhores (0 = Todos)", min_value=0, value=0, step=10)
 
-# Configurar coluna Link como link clicável com emoji
-column_config["Link"] = st.column_config.LinkColumn("Link", display_text="🔗")
+    return top_k(score(index, weights, method, by_segment), top or None, rows)
 
-column_config["Rank"] = st.column_config.NumberColumn("Rank", pinned=True)
 
-column_config["Ticker"] = st.column_config.TextColumn("Ticker", pinned=True)
+def show_table(df: pd.DataFrame, rows: np.ndarray) -> None:
+    """Mostra a tabela principal com as linhas selecionadas."""
+    df = df.iloc[rows]
 
-column_config["⭐"] = st.column_config.TextColumn("⭐")
+    # Criar coluna com estrela para FIIs que o usuário possui
+    df["⭐"] = np.where(df["Ticker"].isin(get_my_tickers()), "⭐", "")
 
-# Reordenar colunas para colocar estrela e Link após Ticker
-cols = list(df.columns)
-if "Ticker" in cols:
-    ticker_idx = cols.index("Ticker")
+    # Criar coluna Link antes de processar o dataframe
+    df["Link"] = INVESTIDOR10_BASE_URL + df["Ticker"].astype(str).str.lower()
 
-    # Remover estrela e Link da posição atual
-    if "⭐" in cols:
-        cols.remove("⭐")
-    if "Link" in cols:
-        cols.remove("Link")
+    df = df.drop(columns=df.filter(regex="(approved$|rank$)").columns)
+    df = df.reset_index(drop=True).reset_index().rename(columns={"index": "Rank"})
+    df["Rank"] = df["Rank"] + 1
 
-    # Inserir estrela e Link após Ticker
-    insert_pos = ticker_idx + 1
-    if "⭐" in df.columns:
-        cols.insert(insert_pos, "⭐")
-        insert_pos += 1
-    if "Link" in df.columns:
-        cols.insert(insert_pos, "Link")
+    df = df.drop(columns=["Data Atualização"])
 
-    df = df[cols]
+    # Configurar formatação de colunas para st.dataframe: os números continuam numéricos
+    # (ordenação correta) e são formatados pelo próprio st.dataframe
+    column_config = get_number_columns(df, DISPLAY_FORMATS)
 
-# Calcular altura dinamicamente baseada no número de linhas
-num_rows = len(df)
-calculated_height = min(num_rows * 35 + 38, 750)
+    # Configurar coluna Link como link clicável com emoji
+    column_config["Link"] = st.column_config.LinkColumn("Link", display_text="🔗")
 
-df = df.style.format(
-    {
-        **{col: lambda x: "{:,.2f}%".format(x) for col in PERCENT_COLS},
-        **{col: lambda x: "R$ {:,.2f}".format(x) for col in MONEY_COLS},
-        **{col: lambda x: "R$ {:,.0f}".format(x) for col in BIG_MONEY_COLS},
-        **{col: lambda x: "{:,.2f}".format(x) for col in FLOAT_COLS},
-        **{col: lambda x: "{:,.0f}".format(x) for col in INT_COLS},
-    },
-    thousands=".",
-    decimal=",",
-)
+    column_config["Rank"] = st.column_config.NumberColumn("Rank", pinned=True)
 
-st.dataframe(
-    df, column_config=column_config, width="stretch", hide_index=True, height=calculated_height
-)
+    column_config["Ticker"] = st.column_config.TextColumn("Ticker", pinned=True)
+
+    column_config["⭐"] = st.column_config.TextColumn("⭐")
+
+    # Reordenar colunas para colocar estrela e Link após Ticker
+    cols = list(df.columns)
+    if "Ticker" in cols:
+        ticker_idx = cols.index("Ticker")
+
+        # Remover estrela e Link da posição atual
+        if "⭐" in cols:
+            cols.remove("⭐")
+        if "Link" in cols:
+            cols.remove("Link")
+
+        # Inserir estrela e Link após Ticker
+        insert_pos = ticker_idx + 1
+        if "⭐" in df.columns:
+            cols.insert(insert_pos, "⭐")
+            insert_pos += 1
+        if "Link" in df.columns:
+            cols.insert(insert_pos, "Link")
+
+        df = df[cols]
+
+    # Calcular altura dinamicamente baseada no número de linhas
+    num_rows = len(df)
+    calculated_height = min(num_rows * 35 + 38, 750)
+
+    st.dataframe(
+        df,
+        column_config=column_config,
+        width="stretch",
+        hide_index=True,
+        height=calculated_height,
+    )
+
+
+# Filtros e tabela ficam em um fragmento: mudar um filtro reexecuta apenas esta parte da página,
+# sobre os dados e o índice já carregados para a versão
+@st.fragment
+def screener(version: str | None) -> None:
+    title = st.empty()
+    index = get_screener_index(version)
+    rows = rank_rows(index, filter_rows(version, index))
+    title.title(f"{len(rows)} FIIs")
+    show_table(get_data(version), rows)
+
+
+screener(version)
+
+
+# SEGMENT STATISTICS
+segment_stats_formats = {
+    "Qtd de FIIs": "%.0f",
+    **{
+        f"{col} {name}": DISPLAY_FORMATS[col]
+        for col in SEGMENT_STATS_COLS
+        for name in SEGMENT_QUANTILES.values()
+    },
+}
+
+with st.expander("Estatísticas por Segmento"):
+    segment_stats = get_segment_stats(version)
+    st.dataframe(
+        segment_stats,
+        column_config=get_number_columns(segment_stats, segment_stats_formats),
+        width="stretch",
+        hide_index=True,
+    )
@@ -7,6 +7,7 @@ HEADERS = {
 INVESTIDOR10_BASE_URL = "https://investidor10.com.br/fiis/"
 FUNDAMENTUS_URL = "https://www.fundamentus.com.br/fii_resultado.php"
 FNET_BASE_URL = "https://fnet.bmfbovespa.com.br/fnet/publico/abrirGerenciadorDocumentosCVM"
+FNET_DOWNLOAD_URL = "https://fnet.bmfbovespa.com.br/fnet/publico/downloadDocumento"
 WARD_BASE_URL = "https://www.ward.app.br/fiis"
 
 # File Paths
@@ -19,10 +20,28 @@ INVESTIDOR10_FILE = os.path.join(DOWNLOADS_DIR, "investidor10_fiis.csv")
 FUNDAMENTUS_FILE = os.path.join(DOWNLOADS_DIR, "fundamentus_fiis.csv")
 COMMUNICATIONS_FILE = os.path.join(DOWNLOADS_DIR, "communications.csv")
 WARD_FILE = os.path.join(DOWNLOADS_DIR, "ward_fiis.csv")
+FIIS_DATA_FILE = os.path.join(DOWNLOADS_DIR, "fiis_data.arrow")
+SEGMENT_STATS_FILE = os.path.join(DOWNLOADS_DIR, "segment_stats.arrow")
+MANIFEST_FILE = os.path.join(DOWNLOADS_DIR, "manifest.json")
+QUARANTINE_FILE = os.path.join(DOWNLOADS_DIR, "quarantine.csv")
+COMMUNICATIONS_DB_FILE = os.path.join(DOWNLOADS_DIR, "communications.db")
+
+HISTORY_DIR = os.path.join(DOWNLOADS_DIR, "history")
+
+# Documentos dos comunicados, um arquivo por conteúdo (nome = hash SHA-256)
+DOCUMENTS_DIR = os.path.join(DOWNLOADS_DIR, "documents")
+DOCUMENTS_MAX_WORKERS = 8
+
+# Data Versions
+DATA_VERSIONS_DIR = os.path.join(DOWNLOADS_DIR, "versions")
+CURRENT_VERSION_FILE = os.path.join(DOWNLOADS_DIR, "CURRENT")
+DATA_VERSIONS_TO_KEEP = 5
 
 MY_FIIS_FILE = os.path.join(CONFIG_DIR, "my_fiis.json")
+PORTFOLIOS_FILE = os.path.join(CONFIG_DIR, "portfolios.csv")
 WANTED_FIIS_FILE = os.path.join(CONFIG_DIR, "wanted_fiis.json")
 COMMUNICATIONS_READ_FILE = os.path.join(CONFIG_DIR, "communications_read.json")
+SCREENER_PRESETS_FILE = os.path.join(CONFIG_DIR, "screener_presets.json")
 
 # Main Data Columns
 PERCENT_COLS = ["Dividend Yield", "Vacância", "Variação 12M", "Último Yield"]
@@ -30,3 +49,65 @@ MONEY_COLS = ["Cotação", "Último Rendimento"]
 BIG_MONEY_COLS = ["Liquidez Diária", "Valor de Mercado", "Valor Patrimonial"]
 FLOAT_COLS = ["P/VP"]
 INT_COLS = ["Rank", "Qtd de imóveis", "Número de Cotistas"]
+
+# Segment Statistics
+# Colunas comparadas entre os FIIs de um mesmo segmento: cada FII recebe uma coluna
+# "Percentil <coluna>" (0 a 100) e a tabela de segmentos traz os quartis de cada uma.
+SEGMENT_STATS_COLS = ["P/VP", "Dividend Yield", "Vacância", "Liquidez Diária"]
+SEGMENT_PERCENTILE_COLS = [f"Percentil {col}" for col in SEGMENT_STATS_COLS]
+SEGMENT_QUANTILES = {0.25: "Q1", 0.5: "Mediana", 0.75: "Q3"}
+
+# Data Schema
+# Tipo de cada coluna dos dados, aplicado na escrita dos scrapes (valores inválidos vão para a
+# quarentena) e na leitura dos dados, para que as páginas possam confiar nos tipos.
+DATA_SCHEMA = {
+    # Textos com poucos valores distintos
+    "Ticker": "category",
+    "Tipo": "category",
+    "Segmento": "category",
+    "Tipo de Gestão": "category",
+    "Público Alvo": "category",
+    "Taxa de Administração": "category",
+    "CNPJ": "category",
+    "Nome do Fundo": "category",
+    "Categoria": "category",
+    "Status": "category",
+    "Mês de Referência": "category",
+    # Contagens
+    "Qtd de imóveis": "Int16",
+    "Número de Cotistas": "Int32",
+    "Versão": "Int16",
+    # Identificadores
+    "Documento": "Int64",
+    # Índices e percentuais
+    "P/VP": "float32",
+    "Dividend Yield": "float32",
+    "Último Yield": "float32",
+    "Vacância": "float32",
+    "Variação 12M": "float32",
+    **{col: "float32" for col in SEGMENT_PERCENTILE_COLS},
+    # Valores em reais, mantidos em float64 pois são somados nas páginas
+    "Cotação": "float64",
+    "Último Rendimento": "float64",
+    "Liquidez Diária": "float64",
+    "Valor de Mercado": "float64",
+    "Valor Patrimonial": "float64",
+    "Cotas Emitidas": "float64",
+}
+
+# Ranking
+# Peso de cada fator no ranking do Buscador: positivo quando valores maiores são melhores,
+# negativo quando valores menores são melhores e zero para ignorar o fator.
+RANKING_WEIGHTS = {
+    "Dividend Yield": 2.0,
+    "P/VP": -1.0,
+    "Liquidez Diária": 0.0,
+    "Vacância": 0.0,
+    "Último Yield": 0.0,
+}
+RANKING_METHODS = {"rank": "Posição", "zscore": "Z-Score", "percentile": "Percentil"}
+
+# Portfolios
+# Carteiras adicionais ficam em PORTFOLIOS_FILE, uma linha por posição (Carteira, Ticker,
+# Quantidade, Preço Médio); as quantidades de MY_FIIS_FILE formam a carteira padrão.
+DEFAULT_PORTFOLIO = "Meus FIIs"
@@ -1,44 +1,55 @@
-import json
-
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from config.settings import COMMUNICATIONS_READ_FILE, FNET_BASE_URL
+from config.settings import FNET_BASE_URL
+from src.communications_store import (
+    get_unread_total,
+    load_read_ids,
+    search_communications,
+    set_read,
+    sync_communications,
+)
 from src.data import get_communications_data as get_data
+from src.utils.data_version import get_current_version, get_version_key
 from src.utils.get_date import get_last_update_date
 from src.utils.get_tickers import get_my_tickers, get_wanted_tickers
 
+# Copy-on-write para receber cópias rasas dos DataFrames do cache de dados (ver buscador.py)
+pd.set_option("mode.copy_on_write", True)
+
 st.set_page_config(page_title="Comunicados", layout="wide")
 
-df = get_data()
-df = df[df["Ticker"].isin(get_my_tickers() | get_wanted_tickers())]
+version = get_current_version()
+# Os comunicados já vêm ordenados por Ticker e Data de Entrega, com o ID de cada um
+df = get_data(version)
 
 # PERSISTÊNCIA DOS CHECKBOXES
 
-
-# Função para carregar os dados do JSON
-def load_checkbox_state():
-    with open(COMMUNICATIONS_READ_FILE, "r") as f:
-        return json.load(f)
-
-
-# Função para salvar os dados no JSON
-def save_checkbox_state(state_dict):
-    with open(COMMUNICATIONS_READ_FILE, "w") as f:
-        json.dump(state_dict, f)
-
+# Inclui os comunicados novos dos FIIs acompanhados no banco e remove os que saíram dos dados ou
+# de FIIs que deixaram de ser acompanhados (uma vez por versão e conjunto de FIIs)
+tracked_tickers = get_my_tickers() | get_wanted_tickers()
+sync_communications(df, get_version_key(version), tracked_tickers)
 
 # Inicializa o estado se não existir
 if "read" not in st.session_state:
-    st.session_state.read = load_checkbox_state()
+    st.session_state.read = load_read_ids()
+
+df = df[df["Ticker"].isin(tracked_tickers)]
 
 # SIDEBAR FILTERS
 
 atualizado = get_last_update_date()
 st.sidebar.text(f"Atualizado {atualizado}")
+st.sidebar.text(f"📬 {get_unread_total()} comunicados não lidos")
 
 st.sidebar.header("Filtros")
 
+# Busca textual no índice FTS5, sem diferenciar acentos e aceitando prefixos ("relat")
+query = st.sidebar.text_input("Buscar", placeholder="Ticker, fundo, categoria ou tipo")
+if query.strip():
+    df = df[df["ID"].isin(search_communications(query))]
+
 tickers_list = sorted(df["Ticker"].dropna().unique())
 tickers = st.sidebar.multiselect("Ticker(s)", options=tickers_list, default=None)
 if tickers:
@@ -68,61 +79,33 @@ if wanted_tickers:
 
 # TABELA INTERATIVA
 
-# Converte Data de Entrega de volta para datetime para ordenação correta
-df["Data de Entrega_DT"] = pd.to_datetime(
-    df["Data de Entrega"], format="%Y/%m/%d %Hh%Mmin", errors="coerce"
-)
-
-# Formata Data de Entrega para exibição (dia/mês/ano horas)
-df["Data de Entrega_Formatada"] = df["Data de Entrega_DT"].dt.strftime("%d/%m/%Y %Hh%Mmin")
-
-# Ordena por Data de Entrega (datetime) para manter ordenação correta
-df = df.sort_values(by=["Ticker", "Data de Entrega_DT", "Versão"], ascending=[True, False, False])
-
-# Cria um ID único por linha (usa a coluna original para compatibilidade)
-df["ID"] = df["Ticker"] + "_" + df["Data de Entrega"].astype(str) + "_" + df["Versão"].astype(str)
-df["ID"] = df["ID"].str.replace("/", "").str.replace(":", "").str.replace(" ", "")
-
 # Adiciona coluna de seleção com base no session_state
-df["Lido"] = df["ID"].map(lambda x: st.session_state.read.get(x, False))
+df["Lido"] = df["ID"].isin(st.session_state.read)
 
-# Formata a coluna Status para adicionar emoji quando for Inativo ou Cancelado
-df["Status_Formatado"] = df["Status"].apply(
-    lambda x: f"❌ {x}" if str(x).strip() in ["Inativo", "Cancelado"] else str(x)
-)
-
-# Formata a coluna Categoria para adicionar emoji quando o status for Inativo ou Cancelado
-df["Categoria_Formatada"] = df.apply(
-    lambda row: (
-        f"❌ {row['Categoria']}"
-        if str(row["Status"]).strip() in ["Inativo", "Cancelado"]
-        else str(row["Categoria"])
-    ),
-    axis=1,
-)
+# Formata as colunas Status e Categoria para adicionar emoji quando o status for Inativo ou
+# Cancelado
+cancelado = df["Status"].astype(str).str.strip().isin(["Inativo", "Cancelado"]).to_numpy()
+prefixo = np.where(cancelado, "❌ ", "").astype(object)
+df["Status_Formatado"] = prefixo + df["Status"].astype(str)
+df["Categoria_Formatada"] = prefixo + df["Categoria"].astype(str)
 
 st.title(f"{df['Ticker'].nunique()} FIIs")
 
-unique_tickers = df[["Ticker", "CNPJ"]].drop_duplicates()
+unique_tickers = df[["Ticker", "CNPJ"]].drop_duplicates().astype(str)
 
-# Monta os links no formato HTML
-links = [
-    f'<a href="{FNET_BASE_URL}?cnpjFundo={row.CNPJ}" target="_blank">{row.Ticker}</a>'
-    for _, row in unique_tickers.iterrows()
-]
-
-# Junta os links com " | "
+# Monta os links no formato HTML e junta com " | "
+links = (
+    f'<a href="{FNET_BASE_URL}?cnpjFundo='
+    + unique_tickers["CNPJ"]
+    + '" target="_blank">'
+    + unique_tickers["Ticker"]
+    + "</a>"
+)
 link_bar = " | ".join(links)
 
 # Exibe os links no topo da página
 st.markdown(f"##### Documentos - {link_bar}", unsafe_allow_html=True)
 
-# Salva o estado anterior para detectar mudanças
-if "previous_read_state" not in st.session_state:
-    st.session_state.previous_read_state = st.session_state.read.copy()
-
-previous_state = st.session_state.previous_read_state.copy()
-
 # Exibe editor interativo
 edited_df = st.data_editor(
     df[
@@ -150,25 +133,21 @@ edited_df = st.data_editor(
 )
 
 
-# Atualiza session_state e salva no JSON
-for i, row in edited_df.iterrows():
-    st.session_state.read[row["ID"]] = row["Lido"]
-
-save_checkbox_state(st.session_state.read)
+# Grava apenas as linhas em que o editor mudou o estado de leitura
+changed = edited_df["Lido"].to_numpy() != df["Lido"].to_numpy()
+if changed.any():
+    changes = dict(zip(edited_df["ID"][changed], edited_df["Lido"][changed]))
+    set_read(changes)
+    st.session_state.read |= {key for key, value in changes.items() if value}
+    st.session_state.read -= {key for key, value in changes.items() if not value}
 
-# Detecta se houve mudanças e faz rerun automático
-if previous_state != st.session_state.read:
-    st.session_state.previous_read_state = st.session_state.read.copy()
+    # Reexecuta para atualizar as contagens de não lidos
     st.rerun()
 
-# Conta quantos comunicados não lidos por Ticker
-unread_count = df[~df["Lido"]].groupby("Ticker").size().sort_index()
-
-# Conta todos os FIIs (incluindo os que têm todos os comunicados lidos)
-all_tickers_count = df.groupby("Ticker").size().sort_index()
-
-# Preenche com 0 os FIIs que não têm comunicados não lidos
-unread_count = unread_count.reindex(all_tickers_count.index, fill_value=0)
+# Quantidade de comunicados não lidos de cada FII listado, sobre os comunicados filtrados
+# (incluindo os FIIs que têm todos os comunicados lidos); o total geral da barra lateral vem do
+# banco
+unread_count = (~df["Lido"]).groupby(df["Ticker"].astype(str)).sum().sort_index()
 
 # Calcula total de comunicados não lidos
 total_unread = unread_count.sum() if not unread_count.empty else 0
@@ -256,47 +235,42 @@ if not unread_count.empty:
 
     st.markdown(f"### {total_unread} Comunicados não lidos")
 
-    # Cards em grid (3 colunas)
+    # Cards em grid (3 colunas), montados de uma vez e exibidos em um único bloco HTML
     num_cols = 3
-    cols = st.columns(num_cols)
-
-    # Função para determinar cor baseada na quantidade
-    def get_color(count):
-        if count == 0:
-            return "#28a745"  # Verde para todos lidos
-        elif count >= 8:
-            return "#dc3545"  # Vermelho para muitos
-        elif count >= 4:
-            return "#ffc107"  # Amarelo para médio
-        else:
-            return "#17a2b8"  # Azul para poucos
-
-    for idx, (ticker, count) in enumerate(unread_count.items()):
-        col_idx = idx % num_cols
-        color = get_color(count)
-
-        with cols[col_idx]:
-            if count == 0:
-                message = "Todos comunicados lidos"
-            else:
-                message = f"{'comunicado' if count == 1 else 'comunicados'} não {'lido' if count == 1 else 'lidos'}"
-
-            st.markdown(
-                f"""
-            <div style='padding: 15px; margin-bottom: 15px; background-color: {color}15;
-                        border-left: 4px solid {color}; border-radius: 8px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);'>
-                <div style='display: flex; justify-content: space-between; align-items: center;'>
-                    <strong class='fii-card-text' style='font-size: 18px;'>{ticker}</strong>
-                    <span style='background-color: {color}; color: white; padding: 5px 12px;
-                                border-radius: 20px; font-weight: bold; font-size: 16px;'>
-                        {count}
-                    </span>
-                </div>
-                <p class='fii-card-subtext' style='margin: 5px 0 0 0; font-size: 12px;'>
-                    {message}
-                </p>
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
+    counts = unread_count.to_numpy()
+
+    # Cor baseada na quantidade: verde para todos lidos, vermelho para muitos, amarelo para
+    # médio e azul para poucos
+    colors = np.select(
+        [counts == 0, counts >= 8, counts >= 4], ["#28a745", "#dc3545", "#ffc107"], "#17a2b8"
+    ).astype(object)
+    messages = np.select(
+        [counts == 0, counts == 1],
+        ["Todos comunicados lidos", "comunicado não lido"],
+        "comunicados não lidos",
+    ).astype(object)
+
+    cards = (
+        "<div style='padding: 15px; background-color: "
+        + colors
+        + "15; border-left: 4px solid "
+        + colors
+        + "; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);'>"
+        + "<div style='display: flex; justify-content: space-between; align-items: center;'>"
+        + "<strong class='fii-card-text' style='font-size: 18px;'>"
+        + unread_count.index.astype(str).to_numpy(dtype=object)
+        + "</strong><span style='background-color: "
+        + colors
+        + "; color: white; padding: 5px 12px; border-radius: 20px; font-weight: bold;"
+        + " font-size: 16px;'>"
+        + counts.astype(str).astype(object)
+        + "</span></div><p class='fii-card-subtext' style='margin: 5px 0 0 0; font-size: 12px;'>"
+        + messages
+        + "</p></div>"
+    )
+
+    st.markdown(
+        f"<div style='display: grid; grid-template-columns: repeat({num_cols}, 1fr);"
+        f" gap: 15px;'>{''.join(cards)}</div>",
+        unsafe_allow_html=True,
+    )
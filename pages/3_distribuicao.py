@@ -1,49 +1,46 @@
-import json
-import os
-
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
-from config.settings import MY_FIIS_FILE
+from src.charts import (
+    build_holdings_bar,
+    build_segment_pie,
+    get_cached_figure,
+    get_portfolio_hash,
+    get_segment_colors,
+)
+from src.communications_store import get_unread_total
 from src.data import get_fiis_data as get_data
+from src.portfolio import (
+    POSITION_COLUMNS,
+    get_portfolios_summary,
+    get_segment_exposure,
+    join_portfolios,
+    load_positions,
+)
+from src.rebalance import REBALANCE_BY, plan_rebalance
+from src.utils.data_version import get_current_version
+from src.utils.formatting import get_number_columns
 from src.utils.get_date import get_last_update_date
-from src.utils.get_tickers import get_my_tickers
+
+# Copy-on-write para receber cópias rasas dos DataFrames do cache de dados (ver buscador.py)
+pd.set_option("mode.copy_on_write", True)
 
 st.set_page_config(page_title="Distribuição", layout="wide")
 
 # Carrega os dados dos FIIs
-df = get_data()
-df = df[df["Ticker"].isin(get_my_tickers())].sort_values("Ticker")
-
+version = get_current_version()
+df = get_data(version)
 
-# CARREGAMENTO DAS QUANTIDADES
 
+# CARREGAMENTO DAS POSIÇÕES
 
-def _get_config_path(filename):
-    """Retorna o caminho completo do arquivo de configuração"""
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    config_path = os.path.join(project_root, "config", filename)
-    # Garante que o diretório config existe
-    os.makedirs(os.path.dirname(config_path), exist_ok=True)
-    return config_path
-
-
-def load_quantities():
-    """Carrega as quantidades salvas dos FIIs"""
-    file_path = _get_config_path(MY_FIIS_FILE)
-    if os.path.exists(file_path):
-        with open(file_path, "r") as f:
-            return json.load(f)
-    return {}
-
-
-# Carrega as quantidades
-quantities = load_quantities()
+# Posições de todas as carteiras
+positions = load_positions()
 
 # VERIFICAÇÃO DE DADOS
 
-if not quantities or all(qty == 0 for qty in quantities.values()):
+if positions.empty or (positions["Quantidade"] == 0).all():
     st.warning("⚠️ Nenhuma quantidade de FII foi encontrada!")
     st.info(
         '💡 Acesse a página **"Meus FIIs - Quantidades"** para inserir as quantidades dos seus FIIs.'
@@ -51,41 +48,37 @@ if not quantities or all(qty == 0 for qty in quantities.values()):
     st.stop()
 
 # Filtra apenas FIIs com quantidade > 0
-active_fiis = {ticker: qty for ticker, qty in quantities.items() if qty > 0}
+positions = positions[positions["Quantidade"] > 0]
 
-if not active_fiis:
+if positions.empty:
     st.warning("⚠️ Nenhum FII com quantidade maior que zero encontrado!")
     st.info(
         '💡 Acesse a página **"Meus FIIs - Quantidades"** para inserir as quantidades dos seus FIIs.'
     )
     st.stop()
 
+# Junta as posições de todas as carteiras aos dados de mercado uma única vez, e calcula os
+# agregados de todas as carteiras de uma vez
+df_carteiras = join_portfolios(positions, df)
+summaries = get_portfolios_summary(positions, df_carteiras)
+df_exposicao = get_segment_exposure(df_carteiras)
+
+# SELEÇÃO DA CARTEIRA
+
+carteira = st.selectbox("Carteira", options=summaries.index.tolist())
+
+df_fiis = df_carteiras[df_carteiras["Carteira"] == carteira].reset_index(drop=True)
+summary = summaries.loc[carteira]
+
 # RESUMO GERAL
 
 col1, col2, col3, col4, col5 = st.columns(5)
 
-# Calcula métricas gerais
-total_investido = sum(
-    qty * df[df["Ticker"] == ticker].iloc[0]["Cotação"]
-    for ticker, qty in active_fiis.items()
-    if not df[df["Ticker"] == ticker].empty
-)
-
-total_cotas = sum(active_fiis.values())
-total_fiis = len(active_fiis)
-
-# Calcula DY médio ponderado
-dy_ponderado = 0
-ultimo_yield_ponderado = 0
-for ticker, qty in active_fiis.items():
-    fii_data = df[df["Ticker"] == ticker]
-    if not fii_data.empty:
-        valor_fii = qty * fii_data.iloc[0]["Cotação"]
-        peso = valor_fii / total_investido
-        dy_fii = fii_data.iloc[0]["Dividend Yield"]
-        ultimo_yield_fii = fii_data.iloc[0]["Último Yield"]
-        dy_ponderado += peso * dy_fii
-        ultimo_yield_ponderado += peso * ultimo_yield_fii
+total_investido = summary["Total Investido"]
+total_cotas = int(summary["Total de Cotas"])
+total_fiis = int(summary["FIIs na Carteira"])
+dy_ponderado = summary["DY Médio Ponderado"]
+ultimo_yield_ponderado = summary["Último Yield Ponderado"]
 
 with col1:
     st.metric(
@@ -104,134 +97,138 @@ with col4:
 with col5:
     st.metric("📊 Último Yield Ponderado", f"{ultimo_yield_ponderado:.2f}%".replace(".", ","))
 
-# GRÁFICO DE DISTRIBUIÇÃO POR SEGMENTO
+# GRÁFICOS
 
-# Calcula o valor por segmento
-segmento_data = {}
-for ticker, qty in active_fiis.items():
-    fii_data = df[df["Ticker"] == ticker]
-    if not fii_data.empty:
-        segmento = fii_data.iloc[0]["Segmento"]
-        cotacao = fii_data.iloc[0]["Cotação"]
-        valor_total = qty * cotacao
-
-        if segmento in segmento_data:
-            segmento_data[segmento] += valor_total
-        else:
-            segmento_data[segmento] = valor_total
-
-if segmento_data:
-    # Cria DataFrame para o gráfico
-    df_segmento = pd.DataFrame(list(segmento_data.items()), columns=["Segmento", "Valor Total"])
-    df_segmento = df_segmento.sort_values("Valor Total", ascending=False)
-
-    # Calcula percentuais
-    df_segmento["Percentual"] = (
-        df_segmento["Valor Total"] / df_segmento["Valor Total"].sum() * 100
-    ).round(2)
-
-    # Define paleta de cores consistente
-    cores_paleta = px.colors.qualitative.Set3
-
-    # Cria mapeamento de cores para segmentos
-    segmentos_unicos = df_segmento["Segmento"].unique()
-    color_map = {
-        segmento: cores_paleta[i % len(cores_paleta)] for i, segmento in enumerate(segmentos_unicos)
-    }
-
-    # Cria o gráfico de pizza
-    fig_pizza = px.pie(
-        df_segmento,
-        values="Valor Total",
-        names="Segmento",
-        title="Distribuição do Patrimônio por Segmento",
-        color="Segmento",
-        color_discrete_map=color_map,
-    )
+# Valor por segmento da carteira selecionada
+df_segmento = df_exposicao[df_exposicao["Carteira"] == carteira].reset_index(drop=True)
 
-    # Personaliza o gráfico
-    fig_pizza.update_traces(
-        textposition="outside",
-        textinfo="percent+label",
-        hovertemplate="<b>%{label}</b><br>"
-        + "Valor: R$ %{value:,.2f}<br>"
-        + "Percentual: %{percent}<br>"
-        + "<extra></extra>",
-    )
+# As figuras ficam em cache pela carteira, versão dos dados e tema: enquanto nada disso mudar,
+# as execuções seguintes da página reutilizam as figuras já montadas
+portfolio_hash = get_portfolio_hash(positions[positions["Carteira"] == carteira])
+theme = st.context.theme.type
 
-    fig_pizza.update_layout(
-        font=dict(size=14),
-        showlegend=True,
-        legend=dict(
-            orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.01, font=dict(size=16)
-        ),
-        margin=dict(l=50, r=50, t=50, b=50),
-    )
+# Define paleta de cores consistente entre os dois gráficos
+color_map = get_segment_colors(df_segmento["Segmento"].unique())
 
+# GRÁFICO DE DISTRIBUIÇÃO POR SEGMENTO
+
+if not df_segmento.empty:
+    fig_pizza = get_cached_figure(
+        "pizza_segmentos",
+        portfolio_hash,
+        version,
+        theme,
+        lambda: build_segment_pie(df_segmento, color_map),
+    )
     st.plotly_chart(fig_pizza, width="stretch")
 
 # GRÁFICO DE BARRAS POR FII
 
-# Prepara dados para gráfico de barras
-fiis_data = []
-for ticker, qty in active_fiis.items():
-    fii_data = df[df["Ticker"] == ticker]
-    if not fii_data.empty:
-        fii_row = fii_data.iloc[0]
-        valor_total = qty * fii_row["Cotação"]
-        percentual = (
-            valor_total / total_investido
-        ) * 100  # Usa o mesmo total_investido que funciona
-
-        fiis_data.append(
-            {
-                "Ticker": ticker,
-                "Segmento": fii_row["Segmento"],
-                "Valor Total": valor_total,
-                "Percentual": percentual,
-                "Quantidade": qty,
-                "Cotação": fii_row["Cotação"],
-                "DY": fii_row["Dividend Yield"],
-            }
-        )
-
-df_fiis = pd.DataFrame(fiis_data)
-df_fiis = df_fiis.sort_values("Valor Total", ascending=False)  # Ordena do maior para o menor
-
-# Adiciona coluna de texto para as barras diretamente no DataFrame
-df_fiis["Percentual_Texto"] = df_fiis["Percentual"].apply(lambda x: f"{x:.1f}%")
-
-# Cria o gráfico com dados adicionais para o tooltip
-fig_barras = px.bar(
-    df_fiis,
-    x="Valor Total",
-    y="Ticker",
-    color="Segmento",
-    title="Valor Investido por FII",
-    color_discrete_map=color_map,  # Usa o mesmo mapeamento de cores
-    orientation="h",
-    text="Percentual_Texto",  # Usa diretamente a coluna do DataFrame
-    hover_data={"Quantidade": True, "DY": ":.2f", "Cotação": ":.2f", "Segmento": True},
+fig_barras = get_cached_figure(
+    "barras_fiis", portfolio_hash, version, theme, lambda: build_holdings_bar(df_fiis, color_map)
 )
+st.plotly_chart(fig_barras, width="stretch")
 
-# Atualiza o tooltip personalizado e posição do texto
-fig_barras.update_traces(
-    hovertemplate="<b>%{y}</b><br>"
-    + "Valor Total: R$ %{x:,.2f}<br>"
-    + "Quantidade: %{customdata[0]} cotas<br>",
-    textposition="inside",
-)
+# REBALANCEAMENTO
+
+st.subheader("Rebalanceamento")
+
+alvo_por = st.radio("Alvo por", options=REBALANCE_BY, horizontal=True)
 
-fig_barras.update_layout(
-    xaxis_title="Valor Investido (R$)",
-    yaxis_title="",
-    font=dict(size=12),
-    yaxis={"categoryorder": "total ascending"},  # Ordena do maior valor para o menor
+# Os alvos começam com a distribuição atual da carteira
+df_atual = df_segmento if alvo_por == "Segmento" else df_fiis
+df_alvos = pd.DataFrame(
+    {alvo_por: df_atual[alvo_por].astype(str), "Alvo (%)": df_atual["Percentual"].round(2)}
 )
 
-st.plotly_chart(fig_barras, width="stretch")
+with st.form("rebalanceamento"):
+    df_alvos = st.data_editor(
+        df_alvos,
+        key=f"alvos_{carteira}_{alvo_por}",
+        # Com alvos por FII, é possível incluir FIIs que ainda não estão na carteira
+        num_rows="dynamic" if alvo_por == "Ticker" else "fixed",
+        column_config={
+            "Ticker": st.column_config.SelectboxColumn(
+                "Ticker", options=sorted(df["Ticker"].astype(str)), required=True
+            ),
+            "Segmento": st.column_config.TextColumn("Segmento", disabled=True),
+            "Alvo (%)": st.column_config.NumberColumn("Alvo (%)", min_value=0, format="%.2f"),
+        },
+        width="stretch",
+        hide_index=True,
+    )
+    aporte = st.number_input("Valor do Aporte (R$)", min_value=0.0, value=1000.0, step=100.0)
+    calcular = st.form_submit_button("Calcular Compras", type="primary")
+
+if calcular:
+    df_alvos = df_alvos.dropna(subset=[alvo_por])
+    alvos = dict(zip(df_alvos[alvo_por], df_alvos["Alvo (%)"].fillna(0)))
+
+    # FIIs novos entram na carteira com quantidade zero
+    posicoes = df_fiis[POSITION_COLUMNS]
+    if alvo_por == "Ticker":
+        novos = df_alvos.loc[~df_alvos["Ticker"].isin(df_fiis["Ticker"]), "Ticker"]
+        if len(novos):
+            novos = pd.DataFrame(
+                {"Carteira": carteira, "Ticker": novos, "Quantidade": 0, "Preço Médio": np.nan}
+            )
+            posicoes = pd.concat([posicoes, novos], ignore_index=True)
+    df_compras = plan_rebalance(join_portfolios(posicoes, df), alvos, alvo_por, aporte)
+
+    valor_compras = df_compras["Valor da Compra"].sum()
+    compras_col1, compras_col2 = st.columns(2)
+    compras_col1.metric(
+        "🛒 Total das Compras",
+        f"R$ {valor_compras:,.2f}".replace(",", "TEMP").replace(".", ",").replace("TEMP", "."),
+    )
+    compras_col2.metric(
+        "💵 Sobra do Aporte",
+        f"R$ {aporte - valor_compras:,.2f}".replace(",", "TEMP")
+        .replace(".", ",")
+        .replace("TEMP", "."),
+    )
+
+    df_compras = df_compras.drop(columns=["Valor Total"])
+    st.dataframe(
+        df_compras,
+        column_config=get_number_columns(
+            df_compras,
+            {
+                "Cotação": "R$ %.2f",
+                "Valor da Compra": "R$ %.2f",
+                "Percentual Atual": "%.2f%%",
+                "Percentual Alvo": "%.2f%%",
+                "Percentual Final": "%.2f%%",
+            },
+        ),
+        width="stretch",
+        hide_index=True,
+    )
+
+# COMPARATIVO ENTRE AS CARTEIRAS
+
+if len(summaries) > 1:
+    with st.expander("Comparativo das Carteiras"):
+        comparativo = summaries.reset_index()
+        st.dataframe(
+            comparativo,
+            column_config=get_number_columns(
+                comparativo,
+                {
+                    "Total Investido": "R$ %.2f",
+                    "Custo Total": "R$ %.2f",
+                    "Resultado": "R$ %.2f",
+                    "Total de Cotas": "%.0f",
+                    "DY Médio Ponderado": "%.2f%%",
+                    "Último Yield Ponderado": "%.2f%%",
+                },
+            ),
+            width="stretch",
+            hide_index=True,
+        )
 
 # INFORMAÇÕES ADICIONAIS
 
 atualizado = get_last_update_date()
 st.sidebar.text(f"Atualizado {atualizado}")
+st.sidebar.text(f"📬 {get_unread_total()} comunicados não lidos")
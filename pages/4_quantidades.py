@@ -5,9 +5,13 @@ import pandas as pd
 import streamlit as st
 
 from config.settings import MY_FIIS_FILE, WANTED_FIIS_FILE
+from src.communications_store import get_unread_total
 from src.data import get_fiis_data as get_data
 from src.utils.get_date import get_last_update_date
 
+# Copy-on-write para receber cópias rasas dos DataFrames do cache de dados (ver buscador.py)
+pd.set_option("mode.copy_on_write", True)
+
 st.set_page_config(page_title="Quantidades", layout="wide")
 
 # CSS customizado para melhorar a aparência
@@ -353,3 +357,4 @@ if st.session_state.wanted_fiis:
 
 atualizado = get_last_update_date()
 st.sidebar.text(f"Atualizado {atualizado}")
+st.sidebar.text(f"📬 {get_unread_total()} comunicados não lidos")
@@ -6,6 +6,8 @@ from queue import Empty, Queue
 
 import streamlit as st
 
+from src.communications_store import get_unread_total
+from src.utils.cache import get_cache_stats
 from src.utils.get_date import get_last_update_date
 
 st.set_page_config(page_title="Atualizar", layout="wide")
@@ -30,6 +32,7 @@ st.title("Atualizar Dados")
 
 atualizado = get_last_update_date()
 st.sidebar.text(f"Atualizado {atualizado}")
+st.sidebar.text(f"📬 {get_unread_total()} comunicados não lidos")
 
 # Inicializa o estado da sessão
 if "process_running" not in st.session_state:
@@ -162,6 +165,17 @@ if st.session_state.logs:
 else:
     st.info("Sem logs no momento, execute a atualização ou aguarde alguns segundos.")
 
+# Estatísticas do cache de dados deste processo
+with st.expander("Cache de Dados"):
+    st.dataframe(
+        get_cache_stats(),
+        column_config={
+            "Taxa de Acerto": st.column_config.NumberColumn("Taxa de Acerto", format="%.1f%%")
+        },
+        hide_index=True,
+        width="stretch",
+    )
+
 # Atualiza automaticamente enquanto o processo está rodando
 if st.session_state.process_running:
     time.sleep(0.5)  # Pequeno delay antes de atualizar
@@ -0,0 +1,155 @@
+"""
+Gráficos da página de Distribuição.
+
+Montar as figuras com o plotly express é a parte mais cara da página, e o resultado só muda
+quando mudam as posições da carteira, a versão dos dados ou o tema. As figuras ficam em cache com
+essa chave, e as execuções seguintes reutilizam a figura pronta, restando apenas a serialização
+feita pelo `st.plotly_chart`.
+"""
+
+import hashlib
+from typing import Callable
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from src.utils.cache import register_cache
+from src.utils.data_version import get_current_version, get_version_key
+
+_figures = register_cache("figuras_distribuicao", maxsize=32)
+
+
+def get_portfolio_hash(positions: pd.DataFrame) -> str:
+    """
+    Calcula um hash das posições (Ticker e Quantidade) de uma carteira, independente da ordem
+    das linhas.
+
+    Args:
+        positions (pd.DataFrame): Posições da carteira.
+
+    Returns:
+        str: Hash hexadecimal das posições.
+    """
+    positions = positions[["Ticker", "Quantidade"]].astype({"Ticker": str, "Quantidade": "int64"})
+    positions = positions.sort_values("Ticker", kind="stable")
+    hashes = pd.util.hash_pandas_object(positions, index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+def get_cached_figure(
+    name: str,
+    portfolio_hash: str,
+    version: str | None,
+    theme: str | None,
+    build: Callable[[], go.Figure],
+) -> go.Figure:
+    """
+    Retorna a figura em cache para a carteira, versão dos dados e tema, montando-a com `build`
+    caso ainda não exista. A figura é compartilhada entre as sessões e não deve ser alterada.
+
+    Args:
+        name (str): Nome do gráfico.
+        portfolio_hash (str): Hash das posições, de `get_portfolio_hash`.
+        version (str | None): Versão dos dados, por padrão a versão publicada atual.
+        theme (str | None): Tema do Streamlit ("light" ou "dark").
+        build (Callable[[], go.Figure]): Função que monta a figura.
+
+    Returns:
+        go.Figure: A figura pronta.
+    """
+    version_key = get_version_key(version or get_current_version())
+    return _figures.get_or_load(f"{name}:{portfolio_hash}:{version_key}:{theme}", build)
+
+
+def get_segment_colors(segmentos) -> dict[str, str]:
+    """Cores de cada segmento, na ordem recebida, usadas nos dois gráficos da página."""
+    cores_paleta = px.colors.qualitative.Set3
+    return {segmento: cores_paleta[i % len(cores_paleta)] for i, segmento in enumerate(segmentos)}
+
+
+def build_segment_pie(df_segmento: pd.DataFrame, color_map: dict[str, str]) -> go.Figure:
+    """
+    Monta o gráfico de pizza da distribuição do patrimônio por segmento.
+
+    Args:
+        df_segmento (pd.DataFrame): Colunas Segmento e Valor Total.
+        color_map (dict[str, str]): Cor de cada segmento.
+
+    Returns:
+        go.Figure: O gráfico de pizza.
+    """
+    fig_pizza = px.pie(
+        df_segmento,
+        values="Valor Total",
+        names="Segmento",
+        title="Distribuição do Patrimônio por Segmento",
+        color="Segmento",
+        color_discrete_map=color_map,
+    )
+
+    # Personaliza o gráfico
+    fig_pizza.update_traces(
+        textposition="outside",
+        textinfo="percent+label",
+        hovertemplate="<b>%{label}</b><br>"
+        + "Valor: R$ %{value:,.2f}<br>"
+        + "Percentual: %{percent}<br>"
+        + "<extra></extra>",
+    )
+
+    fig_pizza.update_layout(
+        font=dict(size=14),
+        showlegend=True,
+        legend=dict(
+            orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.01, font=dict(size=16)
+        ),
+        margin=dict(l=50, r=50, t=50, b=50),
+    )
+    return fig_pizza
+
+
+def build_holdings_bar(df_fiis: pd.DataFrame, color_map: dict[str, str]) -> go.Figure:
+    """
+    Monta o gráfico de barras do valor investido em cada FII.
+
+    Args:
+        df_fiis (pd.DataFrame): Posições com dados de mercado, de `join_portfolios`.
+        color_map (dict[str, str]): Cor de cada segmento.
+
+    Returns:
+        go.Figure: O gráfico de barras.
+    """
+    df_fiis = df_fiis.rename(columns={"Dividend Yield": "DY"})
+
+    # Adiciona coluna de texto para as barras diretamente no DataFrame
+    df_fiis["Percentual_Texto"] = df_fiis["Percentual"].round(1).astype(str) + "%"
+
+    # Cria o gráfico com dados adicionais para o tooltip
+    fig_barras = px.bar(
+        df_fiis,
+        x="Valor Total",
+        y="Ticker",
+        color="Segmento",
+        title="Valor Investido por FII",
+        color_discrete_map=color_map,  # Usa o mesmo mapeamento de cores
+        orientation="h",
+        text="Percentual_Texto",  # Usa diretamente a coluna do DataFrame
+        hover_data={"Quantidade": True, "DY": ":.2f", "Cotação": ":.2f", "Segmento": True},
+    )
+
+    # Atualiza o tooltip personalizado e posição do texto
+    fig_barras.update_traces(
+        hovertemplate="<b>%{y}</b><br>"
+        + "Valor Total: R$ %{x:,.2f}<br>"
+        + "Quantidade: %{customdata[0]} cotas<br>",
+        textposition="inside",
+    )
+
+    fig_barras.update_layout(
+        xaxis_title="Valor Investido (R$)",
+        yaxis_title="",
+        font=dict(size=12),
+        yaxis={"categoryorder": "total ascending"},  # Ordena do maior valor para o menor
+    )
+    return fig_barras
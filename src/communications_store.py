@@ -0,0 +1,452 @@
+"""
+Banco SQLite local dos comunicados, com o estado de leitura de cada comunicado.
+
+Apenas os comunicados lidos são guardados, um por linha. Marcar ou desmarcar um comunicado grava
+somente os IDs alterados, em vez de reescrever o histórico inteiro a cada clique.
+
+Os IDs dos comunicados dos FIIs acompanhados (Meus FIIs e FIIs Desejados) são sincronizados com
+o banco uma vez por versão dos dados e conjunto de FIIs: os novos são incluídos, os que saíram dos
+dados são removidos junto com o seu estado de leitura, e os de FIIs que deixaram de ser
+acompanhados são removidos, com o arquivo compactado quando boa parte dele fica livre. Triggers
+mantêm a contagem de não lidos por FII e o total a cada inclusão, remoção ou mudança de estado, de
+modo que consultar as contagens não exige percorrer os comunicados.
+
+Os textos dos comunicados (ticker, nome do fundo, categoria, tipo e, futuramente, o texto dos
+documentos) ficam em um índice de busca textual FTS5, atualizado pelos mesmos triggers, de modo
+que cada sincronização só indexa os comunicados novos.
+
+O banco também registra o documento baixado de cada comunicado (ver src/scrapes/fnet_documents.py),
+pelo hash do conteúdo. Esse registro não sai com a sincronização, pois o FNET só lista os
+comunicados mais recentes e os documentos antigos continuam guardados.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from typing import Iterator
+
+import pandas as pd
+
+from config.settings import COMMUNICATIONS_DB_FILE, COMMUNICATIONS_READ_FILE
+
+log_format = "%(asctime)s - %(levelname)s - %(message)s"
+logging.basicConfig(format=log_format, level=logging.INFO)
+
+# Fração de páginas livres do arquivo a partir da qual ele é compactado com VACUUM
+VACUUM_FREE_RATIO = 0.25
+
+# Versão do esquema do banco (PRAGMA user_version). Ao mudar, as tabelas derivadas dos dados
+# publicados são recriadas e preenchidas de novo na próxima sincronização; o estado de leitura é
+# mantido.
+SCHEMA_VERSION = 2
+
+DROP_DERIVED = """
+DROP TABLE IF EXISTS communications_fts;
+DROP TABLE IF EXISTS communications;
+DROP TABLE IF EXISTS unread_counts;
+DROP TABLE IF EXISTS unread_total;
+"""
+
+# Colunas de texto dos comunicados indexadas na busca
+SEARCH_COLUMNS = {
+    "ticker": "Ticker",
+    "nome": "Nome do Fundo",
+    "categoria": "Categoria",
+    "tipo": "Tipo",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS read_state (
+    id TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS read_state_ticker ON read_state (ticker);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    document TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL DEFAULT (datetime('now'))
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS communications (
+    pk INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    ticker TEXT NOT NULL,
+    nome TEXT NOT NULL DEFAULT '',
+    categoria TEXT NOT NULL DEFAULT '',
+    tipo TEXT NOT NULL DEFAULT '',
+    texto TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS communications_ticker ON communications (ticker);
+
+-- Índice de busca sobre os textos da tabela communications, sem duplicar o conteúdo
+CREATE VIRTUAL TABLE IF NOT EXISTS communications_fts USING fts5(
+    ticker, nome, categoria, tipo, texto,
+    content = 'communications',
+    content_rowid = 'pk',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS communications_fts_insert AFTER INSERT ON communications
+BEGIN
+    INSERT INTO communications_fts (rowid, ticker, nome, categoria, tipo, texto)
+    VALUES (NEW.pk, NEW.ticker, NEW.nome, NEW.categoria, NEW.tipo, NEW.texto);
+END;
+
+CREATE TRIGGER IF NOT EXISTS communications_fts_delete AFTER DELETE ON communications
+BEGIN
+    INSERT INTO communications_fts (communications_fts, rowid, ticker, nome, categoria, tipo, texto)
+    VALUES ('delete', OLD.pk, OLD.ticker, OLD.nome, OLD.categoria, OLD.tipo, OLD.texto);
+END;
+
+CREATE TRIGGER IF NOT EXISTS communications_fts_update AFTER UPDATE ON communications
+BEGIN
+    INSERT INTO communications_fts (communications_fts, rowid, ticker, nome, categoria, tipo, texto)
+    VALUES ('delete', OLD.pk, OLD.ticker, OLD.nome, OLD.categoria, OLD.tipo, OLD.texto);
+    INSERT INTO communications_fts (rowid, ticker, nome, categoria, tipo, texto)
+    VALUES (NEW.pk, NEW.ticker, NEW.nome, NEW.categoria, NEW.tipo, NEW.texto);
+END;
+
+CREATE TABLE IF NOT EXISTS unread_counts (
+    ticker TEXT PRIMARY KEY,
+    unread INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unread_total (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    unread INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO unread_total (id, unread) VALUES (0, 0);
+
+-- Comunicado novo e ainda não lido
+CREATE TRIGGER IF NOT EXISTS communication_added AFTER INSERT ON communications
+WHEN NOT EXISTS (SELECT 1 FROM read_state WHERE id = NEW.id)
+BEGIN
+    INSERT INTO unread_counts (ticker, unread) VALUES (NEW.ticker, 1)
+    ON CONFLICT (ticker) DO UPDATE SET unread = unread + 1;
+    UPDATE unread_total SET unread = unread + 1;
+END;
+
+-- Comunicado não lido que saiu dos dados
+CREATE TRIGGER IF NOT EXISTS communication_removed AFTER DELETE ON communications
+WHEN NOT EXISTS (SELECT 1 FROM read_state WHERE id = OLD.id)
+BEGIN
+    UPDATE unread_counts SET unread = unread - 1 WHERE ticker = OLD.ticker;
+    UPDATE unread_total SET unread = unread - 1;
+END;
+
+-- Comunicado marcado como lido
+CREATE TRIGGER IF NOT EXISTS communication_read AFTER INSERT ON read_state
+WHEN EXISTS (SELECT 1 FROM communications WHERE id = NEW.id)
+BEGIN
+    UPDATE unread_counts SET unread = unread - 1 WHERE ticker = NEW.ticker;
+    UPDATE unread_total SET unread = unread - 1;
+END;
+
+-- Comunicado desmarcado
+CREATE TRIGGER IF NOT EXISTS communication_unread AFTER DELETE ON read_state
+WHEN EXISTS (SELECT 1 FROM communications WHERE id = OLD.id)
+BEGIN
+    INSERT INTO unread_counts (ticker, unread) VALUES (OLD.ticker, 1)
+    ON CONFLICT (ticker) DO UPDATE SET unread = unread + 1;
+    UPDATE unread_total SET unread = unread + 1;
+END;
+"""
+
+
+def _ticker(communication_id: str) -> str:
+    """O ID de um comunicado começa pelo ticker do FII, seguido de "_"."""
+    return communication_id.split("_", 1)[0]
+
+
+_schema_lock = threading.Lock()
+
+
+@contextmanager
+def connect() -> Iterator[sqlite3.Connection]:
+    """
+    Abre uma conexão com o banco dos comunicados. O bloco `with` é uma transação: confirmada ao
+    final, ou desfeita em caso de erro.
+
+    O banco é criado ou atualizado apenas quando o esquema está desatualizado; nas demais conexões
+    só é lido o `PRAGMA user_version`, sem escritas, para que as consultas não disputem o lock
+    de escrita.
+    """
+    os.makedirs(os.path.dirname(COMMUNICATIONS_DB_FILE), exist_ok=True)
+    with closing(sqlite3.connect(COMMUNICATIONS_DB_FILE, timeout=30)) as conn:
+        if _get_schema_version(conn) < SCHEMA_VERSION:
+            _create_schema(conn)
+        with conn:
+            yield conn
+
+
+def _get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """
+    Cria as tabelas, recriando as derivadas dos dados publicados se o esquema mudou, e importa o
+    estado de leitura antigo. Tudo em uma única transação, que grava a versão do esquema ao final.
+    """
+    with _schema_lock:
+        version = _get_schema_version(conn)
+        if version >= SCHEMA_VERSION:
+            return
+
+        # O modo WAL fica gravado no arquivo e não pode ser alterado dentro de uma transação
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "BEGIN IMMEDIATE;\n"
+            + DROP_DERIVED
+            + SCHEMA
+            + "DELETE FROM meta WHERE key = 'synced_version';\n"
+        )
+        try:
+            _migrate_json(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+
+def _migrate_json(conn: sqlite3.Connection) -> None:
+    """Importa uma única vez os comunicados lidos do antigo COMMUNICATIONS_READ_FILE."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+        return
+
+    if os.path.exists(COMMUNICATIONS_READ_FILE):
+        with open(COMMUNICATIONS_READ_FILE, "r") as f:
+            read = json.load(f)
+        conn.executemany(
+            "INSERT OR IGNORE INTO read_state (id, ticker) VALUES (?, ?)",
+            [(key, _ticker(key)) for key, value in read.items() if value],
+        )
+        logging.info(f"Estado de leitura importado de {COMMUNICATIONS_READ_FILE}")
+
+    conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', '1')")
+
+
+def load_read_ids() -> set[str]:
+    """
+    Carrega os IDs dos comunicados lidos.
+
+    Returns:
+        set[str]: IDs dos comunicados marcados como lidos.
+    """
+    with connect() as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM read_state")}
+
+
+def set_read(changes: dict[str, bool]) -> None:
+    """
+    Grava apenas os comunicados cujo estado de leitura mudou, em uma única transação.
+
+    Args:
+        changes (dict[str, bool]): ID do comunicado -> lido.
+    """
+    if not changes:
+        return
+
+    with connect() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO read_state (id, ticker) VALUES (?, ?)",
+            [(key, _ticker(key)) for key, value in changes.items() if value],
+        )
+        conn.executemany(
+            "DELETE FROM read_state WHERE id = ?",
+            [(key,) for key, value in changes.items() if not value],
+        )
+
+
+def sync_communications(df: pd.DataFrame, version_key: str, tickers: set[str]) -> tuple[int, int]:
+    """
+    Sincroniza os comunicados do banco com os dos FIIs acompanhados em uma versão dos dados, uma
+    vez por versão e conjunto de FIIs: inclui os novos (e os indexa para a busca), remove os que
+    não existem mais, junto com o seu estado de leitura, e remove os dos FIIs que deixaram de ser
+    acompanhados, que saem das contagens de não lidos.
+
+    Um FII acompanhado que não está em `df` (falhou no scrape) mantém os seus comunicados, e o
+    estado de leitura de um FII que deixou de ser acompanhado é mantido, para o caso de ele voltar.
+
+    Args:
+        df (pd.DataFrame): Todos os comunicados da versão dos dados, de `get_communications_data`.
+        version_key (str): Chave da versão dos dados, de `get_version_key`.
+        tickers (set[str]): FIIs acompanhados.
+
+    Returns:
+        tuple[int, int]: Quantidade de comunicados incluídos e removidos.
+    """
+    tickers = sorted(map(str, tickers))
+    sync_key = f"{version_key}:{hashlib.sha1(' '.join(tickers).encode()).hexdigest()}"
+    df = df[df["Ticker"].astype(str).isin(tickers)]
+
+    with connect() as conn:
+        done = conn.execute("SELECT value FROM meta WHERE key = 'synced_version'").fetchone()
+        if done and done[0] == sync_key:
+            return 0, 0
+
+        columns = ["id", *SEARCH_COLUMNS]
+        rows = pd.DataFrame(
+            {
+                "id": df["ID"].astype(str),
+                **{
+                    column: df[source].astype(str) if source in df.columns else ""
+                    for column, source in SEARCH_COLUMNS.items()
+                },
+            }
+        )[columns]
+
+        conn.execute(f"CREATE TEMP TABLE current_ids ({', '.join(columns)}, PRIMARY KEY (id))")
+        conn.executemany(
+            f"INSERT OR IGNORE INTO current_ids VALUES ({', '.join('?' * len(columns))})",
+            rows.itertuples(index=False, name=None),
+        )
+        added = conn.execute(
+            f"""
+            INSERT OR IGNORE INTO communications ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM current_ids
+            """
+        ).rowcount
+
+        conn.execute("CREATE TEMP TABLE tracked (ticker TEXT PRIMARY KEY)")
+        conn.executemany("INSERT INTO tracked VALUES (?)", [(ticker,) for ticker in tickers])
+
+        stale = """
+            WHERE ticker IN (SELECT ticker FROM current_ids)
+              AND id NOT IN (SELECT id FROM current_ids)
+        """
+        removed = conn.execute(
+            f"""
+            DELETE FROM communications {stale}
+               OR ticker NOT IN (SELECT ticker FROM tracked)
+            """
+        ).rowcount
+        removed_read = conn.execute(f"DELETE FROM read_state {stale}").rowcount
+
+        conn.execute("DROP TABLE current_ids")
+        conn.execute("DROP TABLE tracked")
+        conn.execute("DELETE FROM unread_counts WHERE unread = 0")
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_version', ?)",
+            (sync_key,),
+        )
+
+    if added or removed:
+        logging.info(f"Comunicados sincronizados: {added} novos, {removed} removidos")
+    if removed_read:
+        logging.info(f"Estado de leitura de {removed_read} comunicados antigos removido")
+        compact()
+    return added, removed
+
+
+def load_document_ids() -> set[str]:
+    """
+    Carrega os IDs dos comunicados cujo documento já foi baixado.
+
+    Returns:
+        set[str]: IDs dos comunicados com documento.
+    """
+    with connect() as conn:
+        return {row[0] for row in conn.execute("SELECT id FROM documents")}
+
+
+def save_documents(documents: list[tuple[str, str, str, str, int]]) -> None:
+    """
+    Registra os documentos baixados.
+
+    Args:
+        documents (list[tuple[str, str, str, str, int]]): Uma tupla por comunicado, com o ID do
+            comunicado, o ID do documento no FNET, o hash SHA-256 do conteúdo, a extensão do
+            arquivo e o tamanho em bytes.
+    """
+    if not documents:
+        return
+
+    with connect() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO documents (id, document, sha256, extension, size)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            documents,
+        )
+
+
+def search_communications(query: str, limit: int | None = None) -> list[str]:
+    """
+    Busca comunicados por palavras-chave no ticker, nome do fundo, categoria, tipo e texto.
+    Todas as palavras precisam aparecer, em qualquer coluna, como palavra inteira ou início de
+    palavra, sem diferenciar maiúsculas e acentos.
+
+    Args:
+        query (str): Palavras buscadas, por exemplo "relatorio gerencial".
+        limit (int | None): Quantidade máxima de resultados, por padrão todos.
+
+    Returns:
+        list[str]: IDs dos comunicados encontrados, do mais para o menos relevante.
+    """
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return []
+
+    # Cada palavra vira um termo entre aspas com busca por prefixo, sem interpretar a sintaxe
+    # de consulta do FTS5 digitada pelo usuário
+    match = " ".join(f'"{term}"*' for term in terms)
+    with connect() as conn:
+        rows = conn.execute(
+            """
+            SELECT communications.id
+            FROM communications_fts
+            JOIN communications ON communications.pk = communications_fts.rowid
+            WHERE communications_fts MATCH ?
+            ORDER BY bm25(communications_fts)
+            LIMIT ?
+            """,
+            (match, -1 if limit is None else limit),
+        )
+        return [row[0] for row in rows]
+
+
+def get_unread_counts() -> dict[str, int]:
+    """
+    Consulta a contagem de comunicados não lidos por FII, mantida pelos triggers do banco.
+
+    Returns:
+        dict[str, int]: Ticker -> quantidade de comunicados não lidos, apenas dos FIIs com
+        comunicados no banco.
+    """
+    with connect() as conn:
+        return dict(conn.execute("SELECT ticker, unread FROM unread_counts"))
+
+
+def get_unread_total() -> int:
+    """
+    Consulta o total de comunicados não lidos, mantido pelos triggers do banco.
+
+    Returns:
+        int: Quantidade de comunicados não lidos.
+    """
+    with connect() as conn:
+        return conn.execute("SELECT unread FROM unread_total").fetchone()[0]
+
+
+def compact() -> None:
+    """Compacta o arquivo do banco quando a fração de páginas livres passa de VACUUM_FREE_RATIO."""
+    with closing(sqlite3.connect(COMMUNICATIONS_DB_FILE, timeout=30)) as conn:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_count / page_count > VACUUM_FREE_RATIO:
+            conn.execute("VACUUM")
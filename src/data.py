@@ -1,32 +1,69 @@
-import re
+import json
+import logging
+import os
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
 from pandas.tseries.offsets import MonthEnd
 from tzlocal import get_localzone
 
 from config.settings import (
-    BIG_MONEY_COLS,
     COMMUNICATIONS_FILE,
-    FLOAT_COLS,
+    FIIS_DATA_FILE,
     FUNDAMENTUS_FILE,
-    INT_COLS,
     INVESTIDOR10_FILE,
-    MONEY_COLS,
-    PERCENT_COLS,
+    SEGMENT_PERCENTILE_COLS,
+    SEGMENT_QUANTILES,
+    SEGMENT_STATS_COLS,
+    SEGMENT_STATS_FILE,
     WARD_FILE,
 )
-
-
-def join_scrapes() -> pd.DataFrame:
+from src.schema import apply_schema, coerce_numeric
+from src.utils.cache import cached_by_version
+from src.utils.data_version import get_current_version, resolve_data_file, stage_files
+
+FIIS_DATA_INPUTS_KEY = b"fiis_data_inputs"
+
+# Tipo de cada FII definido pelo Segmento; os demais segmentos mantêm o Tipo original
+TYPE_BY_SEGMENT = {
+    "Agrícola": "Fundo de Tijolo",
+    "Agências bancárias": "Fundo de Tijolo",
+    "Cemitério": "Fundo de Tijolo",
+    "Desenvolvimento": "Fundo de Desenvolvimento",
+    "Educacional": "Fundo de Tijolo",
+    "FI-Infra": "Outro",
+    "FIP": "Outro",
+    "Fiagros": "Outro",
+    "Fundo de Fundos": "Fundo de Fundos",
+    "Hospitalar": "Fundo de Tijolo",
+    "Hotéis": "Fundo de Tijolo",
+    "Lajes Corporativas": "Fundo de Tijolo",
+    "Logística": "Fundo de Tijolo",
+    "Renda Urbana": "Fundo de Tijolo",
+    "Residencial": "Fundo de Tijolo",
+    "Shoppings": "Fundo de Tijolo",
+}
+
+
+def join_scrapes(version: str | None) -> pd.DataFrame:
     """
     Junta os dados obtidos dos scrapes dos sites Investidor10 e Fundamentus.
 
+    Args:
+        version (str | None): Versão dos dados a ser lida.
+
     Returns:
         pd.DataFrame: Um DataFrame contendo os dados dos FIIs.
     """
-    investidor10_df = pd.read_csv(INVESTIDOR10_FILE)
-    fundamentus_df = pd.read_csv(FUNDAMENTUS_FILE)
+    investidor10_df, _ = coerce_numeric(
+        pd.read_csv(resolve_data_file(INVESTIDOR10_FILE, version)), "Investidor10"
+    )
+    fundamentus_df, _ = coerce_numeric(
+        pd.read_csv(resolve_data_file(FUNDAMENTUS_FILE, version)), "Fundamentus"
+    )
 
     fundamentus_df = fundamentus_df.rename(columns={"Papel": "Ticker"})
     fundamentus_df = fundamentus_df[["Ticker", "Qtd de imóveis", "Valor de Mercado"]]
@@ -36,19 +73,35 @@ def join_scrapes() -> pd.DataFrame:
     return df
 
 
-def get_fiis_data() -> pd.DataFrame:
+def map_type_by_segment(df: pd.DataFrame) -> pd.Series:
+    """
+    Obtém o Tipo de cada FII pelo Segmento, segundo TYPE_BY_SEGMENT.
+
+    Args:
+        df (pd.DataFrame): Dados dos FIIs, com as colunas Segmento e Tipo.
+
+    Returns:
+        pd.Series: O Tipo de cada FII, o original quando o segmento não está no dicionário.
+    """
+    return df["Segmento"].map(TYPE_BY_SEGMENT).fillna(df["Tipo"])
+
+
+def build_fiis_data(version: str | None) -> pd.DataFrame:
     """
-    Obtem os dados de FIIs do site Investidor10 - obtidos através do scrape -
-    e adiciona com alguns dados do Fundamentus.
+    Monta os dados de FIIs do site Investidor10 - obtidos através do scrape -
+    e adiciona com alguns dados do Fundamentus e os segmentos do Ward. O ranking é calculado nas
+    páginas, por `src.screener.ranking`.
+
+    Args:
+        version (str | None): Versão dos dados a ser lida.
 
     Returns:
         pd.DataFrame: Um DataFrame contendo os dados dos FIIs.
     """
-    df = join_scrapes()
+    df = join_scrapes(version)
 
-    cols_to_fill = df.columns.difference(
-        PERCENT_COLS + MONEY_COLS + BIG_MONEY_COLS + FLOAT_COLS + INT_COLS
-    )
+    # Colunas numéricas já têm o tipo do schema, apenas as de texto são preenchidas
+    cols_to_fill = df.select_dtypes(include="object").columns
     df[cols_to_fill] = df[cols_to_fill].fillna("")
 
     df["Último Yield"] = (df["Último Rendimento"] / df["Cotação"] * 100).where(
@@ -89,7 +142,7 @@ def get_fiis_data() -> pd.DataFrame:
     ]
 
     try:
-        ward_fiis = pd.read_csv(WARD_FILE)
+        ward_fiis = pd.read_csv(resolve_data_file(WARD_FILE, version))
         ward_fiis = ward_fiis.rename(columns={"Segmento": "Segmento2"})
         df = df.merge(ward_fiis, how="left", on="Ticker")
         condition = df["Segmento2"].isnull()
@@ -111,37 +164,15 @@ def get_fiis_data() -> pd.DataFrame:
         df["Segmento"] = df["Segmento"].replace(replacements)
         df = df.drop(columns=["Segmento2"])
 
-        type_segment_dict = {
-            "Agrícola": "Fundo de Tijolo",
-            "Agências bancárias": "Fundo de Tijolo",
-            "Cemitério": "Fundo de Tijolo",
-            "Desenvolvimento": "Fundo de Desenvolvimento",
-            "Educacional": "Fundo de Tijolo",
-            "FI-Infra": "Outro",
-            "FIP": "Outro",
-            "Fiagros": "Outro",
-            "Fundo de Fundos": "Fundo de Fundos",
-            "Hospitalar": "Fundo de Tijolo",
-            "Hotéis": "Fundo de Tijolo",
-            "Lajes Corporativas": "Fundo de Tijolo",
-            "Logística": "Fundo de Tijolo",
-            "Renda Urbana": "Fundo de Tijolo",
-            "Residencial": "Fundo de Tijolo",
-            "Shoppings": "Fundo de Tijolo",
-        }
-
         # Substituir Tipo baseado no Segmento usando o dicionário
-        df["Tipo"] = df.apply(
-            lambda row: type_segment_dict.get(row["Segmento"], row["Tipo"]), axis=1
-        )
+        df["Tipo"] = map_type_by_segment(df)
 
     except Exception:
         pass
 
-    df["dy_rank"] = df["Dividend Yield"].rank(ascending=False) * 2
-    df["p_vp_rank"] = df["P/VP"].rank()
-    df["rank"] = df["dy_rank"] + df["p_vp_rank"]
-    df = df.sort_values(by="rank")
+    # Posição de cada FII entre os FIIs do mesmo segmento
+    by_segment = df.groupby("Segmento")[SEGMENT_STATS_COLS]
+    df[SEGMENT_PERCENTILE_COLS] = by_segment.rank(pct=True).to_numpy() * 100
 
     local_tz = get_localzone()
     df["Data Atualização"] = (
@@ -150,19 +181,186 @@ def get_fiis_data() -> pd.DataFrame:
         .dt.tz_convert("America/Sao_Paulo")
     )
 
-    return df
+    return apply_schema(df, "FIIs")
+
+
+def build_segment_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Monta a tabela de estatísticas por segmento: quantidade de FIIs e quartis das colunas de
+    SEGMENT_STATS_COLS.
+
+    Args:
+        df (pd.DataFrame): Dados dos FIIs, como retornados por `build_fiis_data`.
+
+    Returns:
+        pd.DataFrame: Uma linha por segmento.
+    """
+    grouped = df.groupby("Segmento", observed=True)[SEGMENT_STATS_COLS]
+
+    stats = grouped.quantile(list(SEGMENT_QUANTILES)).unstack()
+    stats.columns = [f"{col} {SEGMENT_QUANTILES[quantile]}" for col, quantile in stats.columns]
+    stats.insert(0, "Qtd de FIIs", grouped.size())
+
+    return stats.reset_index()
+
+
+def _fiis_data_inputs_signature(version: str | None) -> str:
+    """
+    Identifica os arquivos de entrada dos dados de FIIs pelo tamanho e data de modificação.
+    Arquivos trazidos de uma versão para outra mantêm a mesma assinatura.
+    """
+    signature = {}
+    for file_path in [INVESTIDOR10_FILE, FUNDAMENTUS_FILE, WARD_FILE]:
+        path = resolve_data_file(file_path, version)
+        stat = os.stat(path) if os.path.exists(path) else None
+        signature[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns] if stat else None
+    return json.dumps(signature, sort_keys=True)
+
+
+def _write_materialized(version_dir: str, file_path: str, df: pd.DataFrame, signature: str) -> None:
+    """
+    Grava um DataFrame como arquivo Arrow IPC sem compressão, com a assinatura das entradas nos
+    metadados. Os processos do servidor mapeiam esse arquivo em memória: as colunas numéricas são
+    lidas direto das páginas do arquivo, compartilhadas pelo sistema operacional entre todos eles.
+    """
+    table = pa.Table.from_pandas(df)
+    # NaN em vez de nulos nas colunas de ponto flutuante, para que sejam lidas sem cópia
+    for i, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type):
+            table = table.set_column(i, field, pc.fill_null(table.column(i), float("nan")))
+
+    metadata = {**(table.schema.metadata or {}), FIIS_DATA_INPUTS_KEY: signature}
+    table = table.replace_schema_metadata(metadata)
+
+    with ipc.new_file(os.path.join(version_dir, os.path.basename(file_path)), table.schema) as f:
+        f.write_table(table)
+
+
+def _read_materialized(file_path: str, version: str | None) -> pd.DataFrame | None:
+    """
+    Lê um arquivo gravado por `_write_materialized`, mapeando-o em memória. Retorna None se a
+    versão não tiver o arquivo ou se ele tiver sido montado a partir de outros arquivos de entrada.
+    """
+    path = resolve_data_file(file_path, version)
+    if version is None or not os.path.exists(path):
+        return None
 
+    reader = ipc.open_file(pa.memory_map(path, "r"))
+    metadata = reader.schema.metadata or {}
+    if metadata.get(FIIS_DATA_INPUTS_KEY) != _fiis_data_inputs_signature(version).encode():
+        return None
 
-def get_communications_data() -> pd.DataFrame:
+    # split_blocks mantém cada coluna apontando para o arquivo mapeado, sem consolidar
+    return reader.read_all().to_pandas(split_blocks=True)
+
+
+def materialize_fiis_data(version_dir: str) -> None:
+    """
+    Monta os dados de FIIs e as estatísticas por segmento uma única vez, a partir dos arquivos de
+    uma versão em staging, e grava o resultado na mesma versão: ela já é publicada pronta para ser
+    carregada pelas páginas sem refazer o ETL.
+
+    Args:
+        version_dir (str): Diretório de staging de uma versão aberta com `staged_version`, depois
+            de escritos os arquivos dos scrapes.
+    """
+    version = stage_files(version_dir, [INVESTIDOR10_FILE, FUNDAMENTUS_FILE, WARD_FILE])
+    df = build_fiis_data(version)
+    signature = _fiis_data_inputs_signature(version)
+
+    _write_materialized(version_dir, FIIS_DATA_FILE, df, signature)
+    _write_materialized(version_dir, SEGMENT_STATS_FILE, build_segment_stats(df), signature)
+
+    logging.info(f"✓ Dados de FIIs materializados ({len(df)} FIIs)")
+
+
+@cached_by_version()
+def get_fiis_data(version: str | None = None) -> pd.DataFrame:
+    """
+    Obtem os dados de FIIs já montados por `materialize_fiis_data`, mapeando o arquivo em memória.
+    Caso a versão não tenha os dados materializados, ou eles tenham sido montados a partir de
+    outros arquivos de entrada, monta os dados na hora.
+
+    Args:
+        version (str | None): Versão dos dados a ser lida, por padrão a versão publicada atual.
+
+    Returns:
+        pd.DataFrame: Um DataFrame contendo os dados dos FIIs.
+    """
+    version = version or get_current_version()
+    df = _read_materialized(FIIS_DATA_FILE, version)
+    return df if df is not None else build_fiis_data(version)
+
+
+@cached_by_version()
+def get_segment_stats(version: str | None = None) -> pd.DataFrame:
+    """
+    Obtem as estatísticas por segmento já montadas por `materialize_fiis_data` ou, caso a versão
+    não as tenha, calcula a partir dos dados de FIIs.
+
+    Args:
+        version (str | None): Versão dos dados a ser lida, por padrão a versão publicada atual.
+
+    Returns:
+        pd.DataFrame: Uma linha por segmento, com a quantidade de FIIs e os quartis das colunas.
+    """
+    version = version or get_current_version()
+    stats = _read_materialized(SEGMENT_STATS_FILE, version)
+    return stats if stats is not None else build_segment_stats(get_fiis_data(version))
+
+
+def parse_reference_dates(values: pd.Series) -> pd.Series:
+    """
+    Converte as datas de referência dos comunicados para datetime. Valores no formato "mm/yyyy"
+    viram o último dia do mês; os demais são lidos como "dd/mm/yyyy" e, se estiverem em outro
+    formato, inferidos um a um.
+
+    Args:
+        values (pd.Series): Datas de referência como texto.
+
+    Returns:
+        pd.Series: Datas de referência como datetime.
+    """
+    values = values.astype(str).str.strip()
+    is_month = values.str.fullmatch(r"\d{2}/\d{4}")
+
+    month_dates = pd.to_datetime(values.where(is_month), format="%m/%Y") + MonthEnd(1)
+    day_dates = pd.to_datetime(values.where(~is_month), format="%d/%m/%Y", errors="coerce")
+
+    # Formatos diferentes de "dd/mm/yyyy" (raros) são inferidos individualmente; em lote, o
+    # format="mixed" inverteria dia e mês de datas ISO ("2023-01-05") por causa do dayfirst
+    other = ~is_month & day_dates.isna()
+    if other.any():
+        day_dates[other] = values[other].map(lambda value: pd.to_datetime(value, dayfirst=True))
+
+    return month_dates.where(is_month, day_dates)
+
+
+@cached_by_version()
+def get_communications_data(version: str | None = None) -> pd.DataFrame:
     """
     Obtém os dados de comunicações dos FIIs.
 
+    Args:
+        version (str | None): Versão dos dados a ser lida, por padrão a versão publicada atual.
+
     Returns:
-        pd.DataFrame: Um DataFrame contendo os dados de comunicações.
+        pd.DataFrame: Um DataFrame contendo os dados de comunicações, do mais recente para o mais
+        antigo em cada FII, com o ID de cada comunicado e a data de entrega já formatada.
     """
-    df = pd.read_csv(COMMUNICATIONS_FILE)
+    version = version or get_current_version()
+    df, _ = coerce_numeric(
+        pd.read_csv(resolve_data_file(COMMUNICATIONS_FILE, version)), "comunicados"
+    )
+
+    # Versões antigas dos dados não têm o nome do fundo nem o ID do documento
+    if "Nome do Fundo" not in df.columns:
+        df.insert(df.columns.get_loc("CNPJ") + 1, "Nome do Fundo", None)
+    if "Documento" not in df.columns:
+        df["Documento"] = pd.Series(pd.NA, index=df.index, dtype="Int64")
 
-    df.fillna("-", inplace=True)
+    text_cols = df.select_dtypes(include="object").columns
+    df[text_cols] = df[text_cols].fillna("-")
 
     local_tz = get_localzone()
     df["Data Atualização"] = (
@@ -171,15 +369,7 @@ def get_communications_data() -> pd.DataFrame:
         .dt.tz_convert("America/Sao_Paulo")
     )
 
-    def parse_data_referencia(value):
-        value = str(value).strip()
-        # Se for do tipo "mm/yyyy", aplica tratamento especial
-        if re.fullmatch(r"\d{2}/\d{4}", value):
-            return pd.to_datetime(value, format="%m/%Y") + MonthEnd(1)
-        else:
-            return pd.to_datetime(value, dayfirst=True)
-
-    df["Data de Referência"] = df["Data de Referência"].apply(parse_data_referencia)
+    df["Data de Referência"] = parse_reference_dates(df["Data de Referência"])
 
     df["Data de Entrega"] = pd.to_datetime(df["Data de Entrega"], dayfirst=True)
 
@@ -187,6 +377,18 @@ def get_communications_data() -> pd.DataFrame:
 
     df["Mês de Referência"] = df["Data de Referência"].dt.strftime("%B").str.capitalize()
     df["Data de Referência"] = df["Data de Referência"].dt.strftime("%Y/%m/%d")
+    df["Data de Entrega_Formatada"] = df["Data de Entrega"].dt.strftime("%d/%m/%Y %Hh%Mmin")
     df["Data de Entrega"] = df["Data de Entrega"].dt.strftime("%Y/%m/%d %Hh%Mmin")
 
+    df = apply_schema(df, "comunicados")
+
+    # ID único de cada comunicado, usado para guardar o estado de leitura
+    df["ID"] = (
+        df["Ticker"].astype(str)
+        + "_"
+        + df["Data de Entrega"].astype(str)
+        + "_"
+        + df["Versão"].astype(str)
+    ).str.replace(r"[/: ]", "", regex=True)
+
     return df
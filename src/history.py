@@ -0,0 +1,236 @@
+"""
+Histórico dos dados de mercado dos FIIs (Investidor10 e Fundamentus).
+
+Cada execução dos scrapes é guardada como um snapshot imutável em Parquet, particionado por fonte
+e por data:
+
+    downloads/history/<fonte>/date=AAAA-MM-DD/<HHMMSSffffff>[-full].parquet
+
+Um snapshot contém apenas os FIIs que mudaram em relação ao estado anterior. O primeiro snapshot
+de cada mês é completo (checkpoint), assim uma consulta nunca precisa ler partições anteriores ao
+último checkpoint antes do início do período pedido.
+"""
+
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config.settings import HISTORY_DIR
+
+log_format = "%(asctime)s - %(levelname)s - %(message)s"
+logging.basicConfig(format=log_format, level=logging.INFO)
+
+SNAPSHOT_DATE_COL = "Data Snapshot"
+REMOVED_COL = "Removido"
+LATEST_FILE = "_latest.parquet"
+FULL_SUFFIX = "-full"
+
+
+def _prepare_snapshot(data: pd.DataFrame) -> pd.DataFrame:
+    """Padroniza o DataFrame de um scrape: indexado por Ticker e sem a data de atualização."""
+    df = data.rename(columns={"Papel": "Ticker"})
+    df = df.drop(columns=["Data Atualização"], errors="ignore")
+    df = df.drop_duplicates(subset="Ticker", keep="last").set_index("Ticker").sort_index()
+    return df
+
+
+def _changed_tickers(current: pd.DataFrame, previous: pd.DataFrame) -> pd.Index:
+    """Retorna os tickers novos ou com alguma coluna diferente do estado anterior."""
+    common = current.index.intersection(previous.index)
+    current_common = current.loc[common]
+    previous_common = previous.loc[common, current.columns]
+
+    both_null = current_common.isna() & previous_common.isna()
+    differs = (current_common != previous_common) & ~both_null
+    changed = common[differs.any(axis=1).to_numpy()]
+
+    return current.index.difference(previous.index).union(changed)
+
+
+def _list_partitions(source_dir: str) -> list[tuple[str, str]]:
+    """Lista as partições (data, caminho) de uma fonte, em ordem cronológica."""
+    if not os.path.exists(source_dir):
+        return []
+    partitions = [
+        (name.removeprefix("date="), os.path.join(source_dir, name))
+        for name in os.listdir(source_dir)
+        if name.startswith("date=")
+    ]
+    return sorted(partitions)
+
+
+def _list_snapshots(partition_dir: str) -> list[str]:
+    """Lista os arquivos de snapshot de uma partição, em ordem cronológica."""
+    files = sorted(name for name in os.listdir(partition_dir) if name.endswith(".parquet"))
+    return [os.path.join(partition_dir, name) for name in files]
+
+
+def _is_checkpoint(snapshot_path: str) -> bool:
+    return snapshot_path.endswith(f"{FULL_SUFFIX}.parquet")
+
+
+def _has_month_checkpoint(source_dir: str, taken_at: datetime) -> bool:
+    """Verifica se já existe um snapshot completo no mês de `taken_at`."""
+    month = taken_at.strftime("%Y-%m")
+    return any(
+        _is_checkpoint(path)
+        for date, partition_dir in _list_partitions(source_dir)
+        if date.startswith(month)
+        for path in _list_snapshots(partition_dir)
+    )
+
+
+def _write_parquet(df: pd.DataFrame, file_path: str, index: bool = False) -> None:
+    """Escreve um Parquet de forma atômica (arquivo temporário + rename)."""
+    tmp_path = f"{file_path}.tmp"
+    df.to_parquet(tmp_path, index=index, compression="zstd")
+    os.replace(tmp_path, file_path)
+
+
+def save_snapshot(data: pd.DataFrame, source: str, taken_at: datetime | None = None) -> str | None:
+    """
+    Guarda o resultado de um scrape como um novo snapshot no histórico.
+
+    Args:
+        data (pd.DataFrame): DataFrame obtido pelo scrape.
+        source (str): Nome da fonte dos dados, por exemplo "investidor10" ou "fundamentus".
+        taken_at (datetime | None): Momento do snapshot, por padrão o momento atual.
+
+    Returns:
+        str | None: Caminho do snapshot escrito, ou None caso não haja dados ou mudanças.
+    """
+    if data is None or data.empty:
+        logging.warning(f"Histórico {source}: nenhum dado para guardar.")
+        return None
+
+    taken_at = taken_at or datetime.now()
+    source_dir = os.path.join(HISTORY_DIR, source)
+    latest_path = os.path.join(source_dir, LATEST_FILE)
+
+    current = _prepare_snapshot(data)
+    previous = pd.read_parquet(latest_path) if os.path.exists(latest_path) else None
+
+    full = (
+        previous is None
+        or list(previous.columns) != list(current.columns)
+        or not _has_month_checkpoint(source_dir, taken_at)
+    )
+
+    changed = current if full else current.loc[_changed_tickers(current, previous)]
+    removed = current.iloc[0:0]
+    if previous is not None:
+        removed = removed.reindex(previous.index.difference(current.index))
+
+    if changed.empty and removed.empty:
+        logging.info(f"✓ Histórico {source}: nenhuma mudança desde o último snapshot")
+        return None
+
+    snapshot = pd.concat(
+        [changed.assign(**{REMOVED_COL: False}), removed.assign(**{REMOVED_COL: True})]
+    )
+
+    snapshot = snapshot.rename_axis("Ticker").reset_index()
+    snapshot.insert(0, SNAPSHOT_DATE_COL, pd.Timestamp(taken_at))
+
+    partition_dir = os.path.join(source_dir, f"date={taken_at:%Y-%m-%d}")
+    os.makedirs(partition_dir, exist_ok=True)
+    snapshot_path = os.path.join(
+        partition_dir, f"{taken_at:%H%M%S%f}{FULL_SUFFIX if full else ''}.parquet"
+    )
+
+    _write_parquet(snapshot, snapshot_path)
+    _write_parquet(current, latest_path, index=True)
+
+    logging.info(
+        f"✓ Histórico {source}: snapshot {'completo' if full else 'incremental'} "
+        f"com {len(snapshot)} de {len(current)} FIIs"
+    )
+    return snapshot_path
+
+
+def _snapshot_time(snapshot_path: str) -> pd.Timestamp:
+    """Momento de um snapshot, pela data da partição e pelo horário no nome do arquivo."""
+    date = os.path.basename(os.path.dirname(snapshot_path)).removeprefix("date=")
+    time = os.path.basename(snapshot_path)[:12]
+    return pd.to_datetime(f"{date} {time}", format="%Y-%m-%d %H%M%S%f")
+
+
+def _snapshots_to_read(source_dir: str, start: pd.Timestamp | None, end: pd.Timestamp | None):
+    """
+    Seleciona os snapshots necessários para o período: a partir do último checkpoint tirado até
+    o início (ou do primeiro snapshot, se não houver) até o último snapshot antes do fim.
+    """
+    snapshots = [
+        path
+        for date, partition_dir in _list_partitions(source_dir)
+        if end is None or pd.Timestamp(date) <= end.normalize()
+        for path in _list_snapshots(partition_dir)
+    ]
+
+    first = 0
+    if start is not None:
+        for i, path in enumerate(snapshots):
+            # Um checkpoint tirado mais tarde no dia do início não tem o estado anterior a ele
+            if _snapshot_time(path) > start:
+                break
+            if _is_checkpoint(path):
+                first = i
+
+    return snapshots[first:]
+
+
+def get_history(
+    tickers: list[str] | None = None,
+    columns: list[str] | None = None,
+    start: str | datetime | None = None,
+    end: str | datetime | None = None,
+    source: str = "investidor10",
+) -> pd.DataFrame:
+    """
+    Obtém o histórico de valores dos FIIs no período.
+
+    Apenas as partições do período e as colunas pedidas são lidas. O resultado traz, para cada FII,
+    o estado vigente no início do período seguido de cada mudança até o fim do período; um valor
+    vale até a próxima linha do mesmo Ticker.
+
+    Args:
+        tickers (list[str] | None): Tickers desejados, por padrão todos.
+        columns (list[str] | None): Colunas desejadas, por padrão todas.
+        start (str | datetime | None): Início do período.
+        end (str | datetime | None): Fim do período (inclusivo).
+        source (str): Fonte dos dados, "investidor10" ou "fundamentus".
+
+    Returns:
+        pd.DataFrame: Um DataFrame com "Data Snapshot", "Ticker", "Removido" e as colunas pedidas.
+    """
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    if end is not None and end == end.normalize():
+        end = end + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+    base_columns = [SNAPSHOT_DATE_COL, "Ticker", REMOVED_COL]
+    filters = [("Ticker", "in", list(tickers))] if tickers else None
+
+    frames = []
+    for path in _snapshots_to_read(os.path.join(HISTORY_DIR, source), start, end):
+        available = pq.read_schema(path).names
+        wanted = available if columns is None else base_columns + columns
+        read_columns = [col for col in wanted if col in available]
+        frames.append(pd.read_parquet(path, columns=read_columns, filters=filters))
+
+    if not frames:
+        return pd.DataFrame(columns=base_columns + (columns or []))
+
+    history = pd.concat(frames, ignore_index=True).sort_values(SNAPSHOT_DATE_COL, kind="stable")
+
+    if end is not None:
+        history = history[history[SNAPSHOT_DATE_COL] <= end]
+    if start is not None:
+        before = history[history[SNAPSHOT_DATE_COL] < start].groupby("Ticker").tail(1)
+        before = before[~before[REMOVED_COL]]
+        history = pd.concat([before, history[history[SNAPSHOT_DATE_COL] >= start]])
+
+    return history.sort_values(["Ticker", SNAPSHOT_DATE_COL]).reset_index(drop=True)
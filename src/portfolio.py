@@ -0,0 +1,149 @@
+"""
+Análise das carteiras de FIIs do usuário.
+
+As posições (ticker -> quantidade) são juntadas aos dados de mercado com um único merge, e todos
+os agregados da página de Distribuição saem de operações vetorizadas sobre esse resultado. Com
+várias carteiras, as posições de todas ficam em uma única tabela e os agregados são calculados
+de uma vez com groupby por carteira, sem um loop por carteira.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from config.settings import DEFAULT_PORTFOLIO, MY_FIIS_FILE, PORTFOLIOS_FILE
+
+MARKET_COLUMNS = ["Ticker", "Segmento", "Cotação", "Dividend Yield", "Último Yield"]
+POSITION_COLUMNS = ["Carteira", "Ticker", "Quantidade", "Preço Médio"]
+
+
+def load_positions() -> pd.DataFrame:
+    """
+    Carrega as posições de todas as carteiras: a carteira padrão, com as quantidades de
+    MY_FIIS_FILE, seguida das carteiras de PORTFOLIOS_FILE.
+
+    Returns:
+        pd.DataFrame: Colunas Carteira (categórica, na ordem em que as carteiras aparecem),
+        Ticker, Quantidade e Preço Médio (nulo quando não informado).
+    """
+    frames = []
+    if os.path.exists(MY_FIIS_FILE):
+        with open(MY_FIIS_FILE, "r") as f:
+            quantities = json.load(f)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Carteira": DEFAULT_PORTFOLIO,
+                    "Ticker": list(quantities.keys()),
+                    "Quantidade": list(quantities.values()),
+                }
+            )
+        )
+    if os.path.exists(PORTFOLIOS_FILE):
+        frames.append(pd.read_csv(PORTFOLIOS_FILE, dtype={"Carteira": str, "Ticker": str}))
+
+    positions = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    positions = positions.reindex(columns=POSITION_COLUMNS).astype(
+        {"Carteira": str, "Ticker": str, "Quantidade": "int64", "Preço Médio": "float64"}
+    )
+    positions["Carteira"] = pd.Categorical(
+        positions["Carteira"], categories=positions["Carteira"].unique()
+    )
+    return positions
+
+
+def join_portfolios(positions: pd.DataFrame, market: pd.DataFrame) -> pd.DataFrame:
+    """
+    Junta as posições de todas as carteiras aos dados de mercado em um único merge e calcula o
+    valor, o custo e o percentual de cada FII dentro da sua carteira. Posições sem dados de
+    mercado ficam de fora.
+
+    Args:
+        positions (pd.DataFrame): Posições com quantidade maior que zero, de `load_positions`.
+        market (pd.DataFrame): Dados dos FIIs, como retornados por `get_fiis_data`.
+
+    Returns:
+        pd.DataFrame: Uma linha por posição, agrupadas por carteira e ordenadas do maior para o
+        menor valor dentro de cada carteira.
+    """
+    market = market[MARKET_COLUMNS].astype({"Ticker": str})
+    df = positions.astype({"Ticker": str}).merge(market, how="inner", on="Ticker")
+
+    df["Valor Total"] = df["Quantidade"] * df["Cotação"]
+    df["Custo Total"] = df["Quantidade"] * df["Preço Médio"]
+    df["Resultado"] = df["Valor Total"] - df["Custo Total"]
+    carteira_total = df.groupby("Carteira", observed=True)["Valor Total"].transform("sum")
+    df["Percentual"] = df["Valor Total"] / carteira_total * 100
+
+    return df.sort_values(
+        ["Carteira", "Valor Total"], ascending=[True, False], kind="stable"
+    ).reset_index(drop=True)
+
+
+def get_portfolios_summary(positions: pd.DataFrame, joined: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula as métricas gerais de todas as carteiras.
+
+    Args:
+        positions (pd.DataFrame): Posições ativas, incluindo as sem dados de mercado.
+        joined (pd.DataFrame): Posições com dados de mercado, de `join_portfolios`.
+
+    Returns:
+        pd.DataFrame: Uma linha por carteira (índice Carteira), com o total investido, o custo
+        total e o resultado das posições com preço médio, o total de cotas, a quantidade de FIIs
+        e os yields médios ponderados pelo valor de cada FII.
+    """
+    # Os yields ponderados saem da soma de valor * yield dividida pelo valor total da carteira
+    totals = (
+        joined.assign(
+            _dy=joined["Valor Total"] * joined["Dividend Yield"],
+            _ultimo_yield=joined["Valor Total"] * joined["Último Yield"],
+        )
+        .groupby("Carteira", observed=True)[
+            ["Valor Total", "Custo Total", "Resultado", "_dy", "_ultimo_yield"]
+        ]
+        .sum(min_count=1)
+    )
+    counts = positions.groupby("Carteira", observed=True).agg(
+        **{"Total de Cotas": ("Quantidade", "sum"), "FIIs na Carteira": ("Ticker", "size")}
+    )
+
+    df = counts.join(totals)
+    total_investido = df["Valor Total"].fillna(0)
+    pesos = total_investido.where(total_investido != 0)
+
+    return pd.DataFrame(
+        {
+            "Total Investido": total_investido,
+            "Custo Total": df["Custo Total"],
+            "Resultado": df["Resultado"],
+            "Total de Cotas": df["Total de Cotas"],
+            "FIIs na Carteira": df["FIIs na Carteira"],
+            "DY Médio Ponderado": (df["_dy"] / pesos).fillna(0),
+            "Último Yield Ponderado": (df["_ultimo_yield"] / pesos).fillna(0),
+        }
+    )
+
+
+def get_segment_exposure(joined: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrupa o valor investido por carteira e segmento.
+
+    Args:
+        joined (pd.DataFrame): Posições com dados de mercado, de `join_portfolios`.
+
+    Returns:
+        pd.DataFrame: Colunas Carteira, Segmento, Valor Total e Percentual (dentro da carteira),
+        do maior para o menor valor em cada carteira.
+    """
+    df = joined.groupby(["Carteira", "Segmento"], observed=True, as_index=False)[
+        "Valor Total"
+    ].sum()
+    df["Segmento"] = df["Segmento"].astype(str)
+    carteira_total = df.groupby("Carteira", observed=True)["Valor Total"].transform("sum")
+    df["Percentual"] = (df["Valor Total"] / carteira_total * 100).round(2)
+
+    return df.sort_values(
+        ["Carteira", "Valor Total"], ascending=[True, False], kind="stable"
+    ).reset_index(drop=True)
@@ -0,0 +1,198 @@
+"""
+Rebalanceamento da carteira com um aporte em dinheiro.
+
+Dadas as porcentagens alvo por FII ou por segmento, calcula quantas cotas inteiras de cada FII
+comprar para que a carteira fique o mais perto possível do alvo, minimizando a soma dos
+quadrados das diferenças entre o valor final e o valor alvo de cada FII. Só há compras: as
+posições atuais nunca são vendidas.
+
+O cálculo tem três etapas vetorizadas com numpy:
+
+1. Solução contínua por "nivelamento": o aporte é distribuído entre os FIIs mais abaixo do alvo
+   até que todos fiquem à mesma distância dele, e cada valor é arredondado para baixo em cotas.
+2. Guloso: a sobra compra, uma cota por vez, o FII em que a cota mais reduz o desvio.
+3. Melhoria local: troca cotas compradas de um FII por cotas de outro enquanto o desvio cair.
+"""
+
+import numpy as np
+import pandas as pd
+
+REBALANCE_BY = ["Segmento", "Ticker"]
+
+# Limite de trocas da melhoria local, apenas como garantia de término
+MAX_SWAPS = 10_000
+
+
+def _continuous_purchases(deficits: np.ndarray, cash: float) -> np.ndarray:
+    """
+    Valor a comprar de cada FII na solução contínua: max(0, déficit - nível), com o nível
+    escolhido para que as compras somem o aporte (ou cubram todos os déficits, se sobrar).
+    """
+    positive = np.sort(deficits[deficits > 0])[::-1]
+    if positive.sum() <= cash:
+        return np.maximum(deficits, 0)
+
+    levels = (np.cumsum(positive) - cash) / np.arange(1, len(positive) + 1)
+    level = levels[positive > levels][-1]
+    return np.maximum(deficits - level, 0)
+
+
+def solve_purchases(
+    prices: np.ndarray, values: np.ndarray, targets: np.ndarray, cash: float
+) -> np.ndarray:
+    """
+    Calcula as cotas inteiras a comprar de cada FII.
+
+    Args:
+        prices (np.ndarray): Cotação de cada FII; FIIs sem cotação válida não são comprados.
+        values (np.ndarray): Valor atual investido em cada FII.
+        targets (np.ndarray): Valor alvo de cada FII depois do aporte.
+        cash (float): Valor disponível para o aporte.
+
+    Returns:
+        np.ndarray: Quantidade de cotas a comprar de cada FII (int64).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    buyable = np.flatnonzero(np.isfinite(prices) & (prices > 0))
+    result = np.zeros(len(prices), dtype=np.int64)
+    if len(buyable) == 0 or cash <= 0:
+        return result
+
+    prices = prices[buyable]
+    deficits = (np.asarray(targets, dtype=np.float64) - np.asarray(values, dtype=np.float64))[
+        buyable
+    ]
+
+    # 1. Solução contínua arredondada para baixo
+    quantities = np.floor(_continuous_purchases(deficits, cash) / prices).astype(np.int64)
+    deficits -= quantities * prices
+    cash -= quantities @ prices
+
+    swaps = 0
+    while True:
+        # 2. Guloso: a cota que mais reduz o desvio, entre as que cabem na sobra
+        gains = np.where(prices <= cash, prices * (2 * deficits - prices), -np.inf)
+        best = np.argmax(gains)
+        if gains[best] > 0:
+            quantities[best] += 1
+            deficits[best] -= prices[best]
+            cash -= prices[best]
+            continue
+
+        # 3. Melhoria local, entre dois FIIs i e j:
+        #    a) compra uma cota de j, desfazendo as cotas de i necessárias para pagá-la
+        #    b) desfaz uma cota de i e compra a melhor quantidade de cotas de j com a sobra
+        if swaps >= MAX_SWAPS:
+            break
+        p_i, p_j = prices[:, None], prices[None, :]
+        d_i, d_j = deficits[:, None], deficits[None, :]
+        q_i = quantities[:, None]
+
+        remove = np.maximum(np.ceil((p_j - cash) / p_i), 0)
+        delta_a = remove * p_i * (2 * d_i + remove * p_i) + p_j * (p_j - 2 * d_j)
+        delta_a[remove > q_i] = np.inf
+
+        add = np.clip(np.round(d_j / p_j), 1, np.floor((cash + p_i) / p_j))
+        delta_b = p_i * (2 * d_i + p_i) + add * p_j * (add * p_j - 2 * d_j)
+        delta_b[(q_i < 1) | (add < 1)] = np.inf
+
+        use_a = delta_a <= delta_b
+        delta = np.where(use_a, delta_a, delta_b)
+        np.fill_diagonal(delta, np.inf)
+
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        # Tolerância relativa para não trocar indefinidamente por erros de arredondamento
+        if not delta[i, j] < -1e-9 * max(1.0, np.abs(deficits).max() ** 2):
+            break
+        removed = int(remove[i, j]) if use_a[i, j] else 1
+        added = 1 if use_a[i, j] else int(add[i, j])
+        quantities[i] -= removed
+        quantities[j] += added
+        deficits[i] += removed * prices[i]
+        deficits[j] -= added * prices[j]
+        cash += removed * prices[i] - added * prices[j]
+        swaps += 1
+
+    result[buyable] = quantities
+    return result
+
+
+def get_target_values(
+    joined: pd.DataFrame, targets: dict[str, float], by: str, cash: float
+) -> np.ndarray:
+    """
+    Converte as porcentagens alvo em valor alvo de cada FII, sobre o valor da carteira depois
+    do aporte. As porcentagens são normalizadas para somar 100%, e FIIs sem alvo ficam com alvo
+    zero.
+
+    Com alvos por segmento, o alvo de cada segmento é dividido entre os seus FIIs na proporção do
+    valor atual de cada um, ou igualmente se o segmento ainda não tiver valor investido.
+
+    Args:
+        joined (pd.DataFrame): Posições de uma carteira com dados de mercado, de `join_portfolios`.
+        targets (dict[str, float]): Porcentagem alvo por ticker ou por segmento.
+        by (str): "Ticker" ou "Segmento", a coluna a que os alvos se referem.
+        cash (float): Valor do aporte.
+
+    Returns:
+        np.ndarray: Valor alvo de cada linha de `joined`.
+    """
+    weights = pd.Series(targets, dtype=np.float64).clip(lower=0)
+    if weights.sum() <= 0:
+        return np.zeros(len(joined))
+    weights = weights / weights.sum()
+    total = joined["Valor Total"].sum() + cash
+
+    keys = joined[by].astype(str)
+    group_targets = keys.map(weights).fillna(0).to_numpy() * total
+    if by == "Ticker":
+        return group_targets
+
+    # Divide o alvo do segmento entre os seus FIIs
+    values = joined["Valor Total"].fillna(0)
+    group_values = values.groupby(keys).transform("sum")
+    group_sizes = keys.groupby(keys).transform("size")
+    shares = np.where(
+        group_values > 0, values / group_values.where(group_values > 0), 1 / group_sizes
+    )
+    return group_targets * shares
+
+
+def plan_rebalance(
+    joined: pd.DataFrame, targets: dict[str, float], by: str, cash: float
+) -> pd.DataFrame:
+    """
+    Calcula as compras do rebalanceamento da carteira.
+
+    Args:
+        joined (pd.DataFrame): Posições de uma carteira com dados de mercado, de
+            `join_portfolios`. Pode incluir FIIs com quantidade zero que se queira comprar.
+        targets (dict[str, float]): Porcentagem alvo por ticker ou por segmento.
+        by (str): "Ticker" ou "Segmento", a coluna a que os alvos se referem.
+        cash (float): Valor do aporte.
+
+    Returns:
+        pd.DataFrame: Uma linha por FII com a quantidade a comprar (Comprar), o valor da compra e
+        os percentuais atual, alvo e final, ordenado do maior para o menor valor de compra.
+    """
+    target_values = get_target_values(joined, targets, by, cash)
+    quantities = solve_purchases(
+        joined["Cotação"].to_numpy(dtype=np.float64, na_value=np.nan),
+        joined["Valor Total"].fillna(0).to_numpy(),
+        target_values,
+        cash,
+    )
+
+    df = joined[["Ticker", "Segmento", "Cotação", "Quantidade", "Valor Total"]].copy()
+    df["Comprar"] = quantities
+    df["Valor da Compra"] = quantities * df["Cotação"].fillna(0)
+
+    total = df["Valor Total"].sum() + cash
+    final_values = df["Valor Total"].fillna(0) + df["Valor da Compra"]
+    df["Percentual Atual"] = df["Valor Total"] / df["Valor Total"].sum() * 100
+    df["Percentual Alvo"] = target_values / total * 100
+    df["Percentual Final"] = final_values / final_values.sum() * 100
+
+    return df.sort_values(
+        ["Valor da Compra", "Valor Total"], ascending=False, kind="stable"
+    ).reset_index(drop=True)
@@ -0,0 +1,94 @@
+"""
+Aplicação do schema dos dados (DATA_SCHEMA, em config/settings.py).
+
+Na escrita dos scrapes, as colunas numéricas são convertidas e os valores inválidos vão para um
+relatório de quarentena. Na leitura, os mesmos tipos são garantidos e as colunas recebem os tipos
+compactos (categóricas, inteiros anuláveis e float32), para que as páginas não precisem converter
+nada a cada execução.
+"""
+
+import logging
+
+import pandas as pd
+
+from config.settings import DATA_SCHEMA
+
+QUARANTINE_COLUMNS = ["Arquivo", "Linha", "Ticker", "Coluna", "Valor"]
+
+
+def _is_numeric(dtype: str) -> bool:
+    return dtype.startswith(("Int", "float"))
+
+
+def coerce_numeric(df: pd.DataFrame, name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Converte as colunas numéricas do schema, separando os valores que não puderam ser convertidos.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser convertido.
+        name (str): Nome do arquivo ou conjunto de dados, usado no relatório e no log.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]: O DataFrame convertido, com os valores inválidos como
+        nulos, e o relatório de quarentena com esses valores.
+    """
+    df = df.copy()
+    quarantined = []
+
+    for column, dtype in DATA_SCHEMA.items():
+        if column not in df.columns or not _is_numeric(dtype):
+            continue
+
+        values = pd.to_numeric(df[column], errors="coerce")
+        invalid = values.isna() & df[column].notna()
+        if invalid.any():
+            quarantined.append(
+                pd.DataFrame(
+                    {
+                        "Arquivo": name,
+                        "Linha": df.index[invalid],
+                        "Ticker": df.loc[invalid, "Ticker"] if "Ticker" in df.columns else None,
+                        "Coluna": column,
+                        "Valor": df.loc[invalid, column].astype(str),
+                    }
+                )
+            )
+
+        df[column] = values.round().astype(dtype) if dtype.startswith("Int") else values
+
+    quarantine = (
+        pd.concat(quarantined, ignore_index=True)
+        if quarantined
+        else pd.DataFrame(columns=QUARANTINE_COLUMNS)
+    )
+    if not quarantine.empty:
+        logging.warning(f"{name}: {len(quarantine)} valores inválidos enviados para a quarentena")
+
+    return df, quarantine
+
+
+def apply_schema(df: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Aplica os tipos do schema às colunas existentes no DataFrame e registra o uso de memória.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser convertido.
+        name (str): Nome do conjunto de dados, usado no log.
+
+    Returns:
+        pd.DataFrame: DataFrame com os tipos aplicados.
+    """
+    memory_before = df.memory_usage(deep=True).sum()
+
+    df, _ = coerce_numeric(df, name)
+    for column, dtype in DATA_SCHEMA.items():
+        # Inteiros anuláveis já foram convertidos por coerce_numeric
+        if column in df.columns and not dtype.startswith("Int"):
+            df[column] = df[column].astype(dtype)
+
+    memory_after = df.memory_usage(deep=True).sum()
+    logging.info(
+        f"Memória dos dados de {name}: {memory_before / 1024:.1f} KB -> "
+        f"{memory_after / 1024:.1f} KB"
+    )
+    return df
@@ -1,10 +1,15 @@
 import logging
+import time
 
 from config.settings import COMMUNICATIONS_FILE, FUNDAMENTUS_FILE, INVESTIDOR10_FILE, WARD_FILE
+from src.data import materialize_fiis_data
+from src.history import save_snapshot
 from src.scrapes.fnet import main as fnet_main
+from src.scrapes.fnet_documents import update_communications
 from src.scrapes.fundamentus import get_fundamentus_data
 from src.scrapes.investidor10 import Investidor10Scraper
 from src.scrapes.ward import main as ward_main
+from src.utils.data_version import staged_version
 from src.utils.get_tickers import get_tickers_with_cnpj
 from src.utils.write_files import write_csv_file
 
@@ -14,26 +19,64 @@ logging.basicConfig(format=log_format, level=logging.INFO)
 if __name__ == "__main__":
     logging.info("Iniciando scrapes...")
 
-    logging.info("--------------------------------")
-    # Investidor10
-    FIIsScraper = Investidor10Scraper()
-    fiis = FIIsScraper.main()
-    write_csv_file(data=fiis, file_path=INVESTIDOR10_FILE)
+    # Todos os arquivos são publicados juntos, em uma única versão, ao final dos scrapes
+    with staged_version() as version_dir:
+        logging.info("--------------------------------")
+        # Investidor10
+        start = time.perf_counter()
+        FIIsScraper = Investidor10Scraper()
+        investidor10_fiis = FIIsScraper.main()
+        write_csv_file(
+            data=investidor10_fiis,
+            file_path=INVESTIDOR10_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
 
-    logging.info("--------------------------------")
-    # Fundamentus
-    fiis = get_fundamentus_data()
-    write_csv_file(data=fiis, file_path=FUNDAMENTUS_FILE)
+        logging.info("--------------------------------")
+        # Fundamentus
+        start = time.perf_counter()
+        fundamentus_fiis = get_fundamentus_data()
+        write_csv_file(
+            data=fundamentus_fiis,
+            file_path=FUNDAMENTUS_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
 
-    logging.info("--------------------------------")
-    # FNET
-    communications = fnet_main(get_tickers_with_cnpj())
-    write_csv_file(data=communications, file_path=COMMUNICATIONS_FILE)
+        logging.info("--------------------------------")
+        # FNET
+        start = time.perf_counter()
+        communications = fnet_main(get_tickers_with_cnpj(version_dir=version_dir))
+        write_csv_file(
+            data=communications,
+            file_path=COMMUNICATIONS_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
 
-    logging.info("--------------------------------")
-    # Ward
-    fiis = ward_main()
-    write_csv_file(data=fiis, file_path=WARD_FILE)
+        logging.info("--------------------------------")
+        # Ward
+        start = time.perf_counter()
+        fiis = ward_main()
+        write_csv_file(
+            data=fiis,
+            file_path=WARD_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
+
+        logging.info("--------------------------------")
+        # Dados de FIIs já juntados das três fontes e estatísticas por segmento, publicados na mesma
+        # versão dos scrapes; o ranking é calculado nas páginas (src/screener/ranking.py)
+        materialize_fiis_data(version_dir)
+
+    # O histórico só recebe os dados de uma versão publicada com sucesso
+    save_snapshot(data=investidor10_fiis, source="investidor10")
+    save_snapshot(data=fundamentus_fiis, source="fundamentus")
+
+    # Comunicados novos entram no banco local e têm os seus documentos baixados
+    update_communications()
 
     logging.info("--------------------------------")
     logging.info("Todos os scrapes concluídos com sucesso!")
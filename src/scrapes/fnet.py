@@ -4,20 +4,23 @@ Scraper para obter comunicados dos FIIs do site FNET.
 
 import argparse
 import logging
+import re
 import sys
 import tempfile
 from datetime import datetime
-from time import sleep
+from time import perf_counter, sleep
 
 import pandas as pd
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from config.settings import COMMUNICATIONS_FILE, FNET_BASE_URL
+from src.scrapes.fnet_documents import update_communications
 from src.utils.get_tickers import get_tickers_with_cnpj
 from src.utils.write_files import write_csv_file
 
@@ -25,6 +28,23 @@ log_format = "%(asctime)s - %(levelname)s - %(message)s"
 logging.basicConfig(format=log_format, level=logging.INFO)
 
 
+def get_document_id(actions: WebElement) -> str | None:
+    """
+    Obtém o ID do documento de um comunicado a partir dos links da coluna Ações.
+
+    Args:
+        actions (WebElement): Célula da coluna Ações.
+
+    Returns:
+        str | None: ID do documento no FNET, ou None se não houver link.
+    """
+    for link in actions.find_elements(By.TAG_NAME, "a"):
+        match = re.search(r"[?&]id=(\d+)", link.get_attribute("href") or "")
+        if match:
+            return match.group(1)
+    return None
+
+
 def get_unique_fii_communications(
     ticker: str, cnpj: str, base_url: str = FNET_BASE_URL, attempt: int = 1, max_attempts: int = 20
 ) -> pd.DataFrame:
@@ -71,7 +91,8 @@ def get_unique_fii_communications(
         data = []
         for row in rows:
             cols = row.find_elements(By.TAG_NAME, "td")
-            data.append([col.text for col in cols])
+            # A coluna Ações só tem ícones; dela fica o ID do documento, usado no download
+            data.append([col.text for col in cols[:-1]] + [get_document_id(cols[-1])])
     finally:
         driver.quit()
 
@@ -100,7 +121,7 @@ def get_unique_fii_communications(
         "Status",
         "Versão",
         "Modalidade de Envio",
-        "Ações",
+        "Documento",
     ]
 
     df = pd.DataFrame(data, columns=columns)
@@ -111,12 +132,14 @@ def get_unique_fii_communications(
         [
             "Ticker",
             "CNPJ",
+            "Nome do Fundo",
             "Categoria",
             "Tipo",
             "Data de Referência",
             "Data de Entrega",
             "Status",
             "Versão",
+            "Documento",
         ]
     ]
 
@@ -244,6 +267,15 @@ if __name__ == "__main__":
         tickers_to_process = all_tickers
         write_mode = "w"
 
+    start = perf_counter()
     communications = main(tickers_to_process)
 
-    write_csv_file(data=communications, file_path=COMMUNICATIONS_FILE, mode=write_mode)
+    write_csv_file(
+        data=communications,
+        file_path=COMMUNICATIONS_FILE,
+        mode=write_mode,
+        duration=perf_counter() - start,
+    )
+
+    # Mesmas etapas do all_scrapes após a publicação: banco local e documentos dos comunicados
+    update_communications()
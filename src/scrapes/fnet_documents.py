@@ -0,0 +1,231 @@
+"""
+Download dos documentos dos comunicados dos FIIs no site FNET.
+
+Os documentos são baixados em paralelo, com um número limitado de conexões simultâneas
+(DOCUMENTS_MAX_WORKERS), e guardados em DOCUMENTS_DIR pelo hash SHA-256 do conteúdo: documentos
+iguais ocupam um único arquivo. O banco dos comunicados registra o arquivo de cada comunicado, e
+os comunicados com documento já baixado são pulados, de modo que cada execução só baixa os novos.
+"""
+
+import argparse
+import base64
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import perf_counter, sleep
+
+import pandas as pd
+import requests
+
+from config.settings import DOCUMENTS_DIR, DOCUMENTS_MAX_WORKERS, FNET_DOWNLOAD_URL, HEADERS
+from src.communications_store import load_document_ids, save_documents, sync_communications
+from src.data import get_communications_data
+from src.utils.data_version import get_current_version, get_version_key
+from src.utils.get_tickers import get_my_tickers, get_wanted_tickers
+
+log_format = "%(asctime)s - %(levelname)s - %(message)s"
+logging.basicConfig(format=log_format, level=logging.INFO)
+
+# Extensão do arquivo pelos primeiros bytes do conteúdo
+MAGIC_EXTENSIONS = {
+    b"%PDF": ".pdf",
+    b"<?xml": ".xml",
+    b"PK\x03\x04": ".zip",
+}
+
+# Documentos baixados entre cada gravação no banco, para não perder o progresso em downloads
+# longos
+SAVE_EVERY = 50
+
+_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Uma sessão HTTP por thread, reaproveitando as conexões entre os downloads."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+        _local.session.headers.update(HEADERS)
+    return _local.session
+
+
+def get_extension(content: bytes) -> str:
+    """Extensão do documento, pelo início do conteúdo; ".html" para texto e ".bin" nos demais."""
+    for magic, extension in MAGIC_EXTENSIONS.items():
+        if content.startswith(magic):
+            return extension
+    if content.lstrip()[:1] == b"<":
+        return ".html"
+    return ".bin"
+
+
+def get_document_path(sha256: str, extension: str) -> str:
+    """Caminho do documento em DOCUMENTS_DIR, em subpastas pelos 2 primeiros caracteres do hash."""
+    return os.path.join(DOCUMENTS_DIR, sha256[:2], sha256 + extension)
+
+
+def fetch_document(
+    document_id: str, base_url: str = FNET_DOWNLOAD_URL, max_attempts: int = 3
+) -> bytes:
+    """
+    Baixa o conteúdo de um documento no FNET.
+
+    Args:
+        document_id (str): ID do documento no FNET.
+        base_url (str): URL de download.
+        max_attempts (int): Número máximo de tentativas.
+
+    Returns:
+        bytes: Conteúdo do documento.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response = _get_session().get(base_url, params={"id": document_id}, timeout=30)
+            response.raise_for_status()
+            content = response.content
+            break
+        except requests.RequestException as e:
+            if attempt == max_attempts:
+                raise
+            logging.info(f"Documento {document_id} - {e}, tentativa {attempt}/{max_attempts}...")
+            sleep(attempt)
+
+    # O FNET entrega os PDFs codificados em base64 ("JVBER" é o início de "%PDF" em base64)
+    if content.startswith(b"JVBER"):
+        content = base64.b64decode(content)
+    return content
+
+
+def store_document(content: bytes) -> tuple[str, str]:
+    """
+    Guarda o conteúdo em DOCUMENTS_DIR, caso ainda não exista um arquivo igual.
+
+    Args:
+        content (bytes): Conteúdo do documento.
+
+    Returns:
+        tuple[str, str]: Hash SHA-256 do conteúdo e extensão do arquivo.
+    """
+    sha256 = hashlib.sha256(content).hexdigest()
+    extension = get_extension(content)
+    file_path = get_document_path(sha256, extension)
+
+    if not os.path.exists(file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # Escrita em arquivo temporário e renomeação, para nunca deixar um arquivo incompleto
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(file_path), delete=False) as f:
+            f.write(content)
+        os.replace(f.name, file_path)
+
+    return sha256, extension
+
+
+def download_document(
+    communication_id: str, document_id: str, base_url: str = FNET_DOWNLOAD_URL
+) -> tuple[str, str, str, str, int]:
+    """Baixa e guarda um documento, retornando o registro para `save_documents`."""
+    content = fetch_document(document_id, base_url)
+    sha256, extension = store_document(content)
+    return communication_id, document_id, sha256, extension, len(content)
+
+
+def fetch_documents(
+    df: pd.DataFrame,
+    base_url: str = FNET_DOWNLOAD_URL,
+    max_workers: int = DOCUMENTS_MAX_WORKERS,
+) -> tuple[int, list[str]]:
+    """
+    Baixa os documentos dos comunicados que ainda não foram baixados.
+
+    Args:
+        df (pd.DataFrame): Comunicados, com as colunas ID e Documento, de `get_communications_data`.
+        base_url (str): URL de download.
+        max_workers (int): Número máximo de downloads simultâneos.
+
+    Returns:
+        tuple[int, list[str]]: Quantidade de documentos baixados e IDs dos comunicados que
+        falharam.
+    """
+    fetched = load_document_ids()
+    pending = df.loc[df["Documento"].notna() & ~df["ID"].isin(fetched), ["ID", "Documento"]]
+    pending = pending.drop_duplicates("ID")
+    if pending.empty:
+        logging.info("Nenhum documento novo para baixar")
+        return 0, []
+
+    logging.info(f"Baixando {len(pending)} documentos com até {max_workers} conexões...")
+
+    documents = []
+    downloaded = 0
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(download_document, communication_id, str(document_id), base_url): (
+                communication_id
+            )
+            for communication_id, document_id in pending.itertuples(index=False, name=None)
+        }
+        # A gravação no banco fica na thread principal, em lotes
+        for future in as_completed(futures):
+            try:
+                documents.append(future.result())
+            except Exception as e:
+                logging.error(f"{futures[future]} - Falha ao baixar documento: {e}")
+                failed.append(futures[future])
+                continue
+
+            if len(documents) >= SAVE_EVERY:
+                save_documents(documents)
+                downloaded += len(documents)
+                documents = []
+
+    save_documents(documents)
+    downloaded += len(documents)
+
+    logging.info(f"{downloaded} documentos baixados, {len(failed)} falhas")
+    return downloaded, failed
+
+
+def update_communications() -> None:
+    """
+    Etapas seguintes à publicação de uma versão com novos comunicados: inclui os comunicados novos
+    no banco local, atualizando a contagem de não lidos e o índice de busca, e baixa os seus
+    documentos.
+    """
+    version = get_current_version()
+    communications = get_communications_data(version)
+    sync_communications(
+        communications, get_version_key(version), get_my_tickers() | get_wanted_tickers()
+    )
+
+    logging.info("--------------------------------")
+    # Documentos dos comunicados novos
+    fetch_documents(communications)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Baixa os documentos dos comunicados do FNET")
+    parser.add_argument(
+        "tickers",
+        nargs="*",
+        help="Tickers dos comunicados a baixar (opcional). Se não informado, baixa de todos.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DOCUMENTS_MAX_WORKERS,
+        help="Número máximo de downloads simultâneos.",
+    )
+
+    args = parser.parse_args()
+
+    communications = get_communications_data()
+    if args.tickers:
+        tickers = [t.upper() for t in args.tickers]
+        communications = communications[communications["Ticker"].isin(tickers)]
+
+    start = perf_counter()
+    fetch_documents(communications, max_workers=args.workers)
+    logging.info(f"Duração: {perf_counter() - start:.2f} segundos")
@@ -9,6 +9,9 @@ import pandas as pd
 import requests
 
 from config.settings import FUNDAMENTUS_FILE, FUNDAMENTUS_URL, HEADERS
+from src.data import materialize_fiis_data
+from src.history import save_snapshot
+from src.utils.data_version import staged_version
 from src.utils.write_files import write_csv_file
 
 log_format = "%(asctime)s - %(levelname)s - %(message)s"
@@ -55,6 +58,15 @@ def get_fundamentus_data(max_attempts: int = 20) -> pd.DataFrame:
 
 
 if __name__ == "__main__":
+    start = time.perf_counter()
     fiis = get_fundamentus_data()
 
-    write_csv_file(data=fiis, file_path=FUNDAMENTUS_FILE)
+    with staged_version() as version_dir:
+        write_csv_file(
+            data=fiis,
+            file_path=FUNDAMENTUS_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
+        materialize_fiis_data(version_dir)
+    save_snapshot(data=fiis, source="fundamentus")
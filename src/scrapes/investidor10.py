@@ -4,6 +4,7 @@ Scraper para obter dados dos FIIs do site Investidor10.
 
 import logging
 import re
+import time
 from datetime import datetime
 
 import pandas as pd
@@ -11,6 +12,9 @@ import requests
 from bs4 import BeautifulSoup
 
 from config.settings import HEADERS, INVESTIDOR10_BASE_URL, INVESTIDOR10_FILE
+from src.data import materialize_fiis_data
+from src.history import save_snapshot
+from src.utils.data_version import staged_version
 from src.utils.write_files import write_csv_file
 
 log_format = "%(asctime)s - %(levelname)s - %(message)s"
@@ -340,7 +344,16 @@ class Investidor10Scraper:
 
 
 if __name__ == "__main__":
+    start = time.perf_counter()
     FIIsScraper = Investidor10Scraper()
     fiis = FIIsScraper.main()
 
-    write_csv_file(data=fiis, file_path=INVESTIDOR10_FILE)
+    with staged_version() as version_dir:
+        write_csv_file(
+            data=fiis,
+            file_path=INVESTIDOR10_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
+        materialize_fiis_data(version_dir)
+    save_snapshot(data=fiis, source="investidor10")
@@ -21,6 +21,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from config.settings import WARD_BASE_URL, WARD_FILE
+from src.data import materialize_fiis_data
+from src.utils.data_version import staged_version
 from src.utils.write_files import write_csv_file
 
 log_format = "%(asctime)s - %(levelname)s - %(message)s"
@@ -338,5 +340,13 @@ def main() -> pd.DataFrame:
 
 
 if __name__ == "__main__":
+    start = time.perf_counter()
     fiis = main()
-    write_csv_file(data=fiis, file_path=WARD_FILE)
+    with staged_version() as version_dir:
+        write_csv_file(
+            data=fiis,
+            file_path=WARD_FILE,
+            version_dir=version_dir,
+            duration=time.perf_counter() - start,
+        )
+        materialize_fiis_data(version_dir)
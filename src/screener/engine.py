@@ -0,0 +1,131 @@
+"""
+Motor de filtros do screener.
+
+Um filtro é uma lista de predicados `(coluna, operador, valor)`, com os operadores "in" (valor em
+um conjunto), ">=" e "<=". O plano de execução junta os predicados de uma mesma coluna, estima
+quantas linhas cada um seleciona e começa pelo mais seletivo; os demais são avaliados apenas
+sobre as linhas candidatas restantes.
+"""
+
+from typing import Callable
+
+import numpy as np
+
+from src.screener.index import ScreenerIndex
+
+OPERATORS = ("in", ">=", "<=")
+
+# Passo do plano: (linhas estimadas, busca em todas as linhas, verificação de linhas candidatas)
+Step = tuple[int, Callable[[], np.ndarray], Callable[[np.ndarray], np.ndarray]]
+
+
+def _membership_step(index: ScreenerIndex, column: str, values: set) -> Step:
+    codes = index.lookup_codes(column, values)
+    # Tabela de consulta por código; o último item cobre o código -1 (valor nulo)
+    table = np.zeros(len(index.categories[column]) + 1, dtype=bool)
+    table[codes] = True
+    column_codes = index.codes[column]
+
+    def scan() -> np.ndarray:
+        return np.flatnonzero(table[column_codes])
+
+    def check(rows: np.ndarray) -> np.ndarray:
+        return rows[table[column_codes[rows]]]
+
+    return int(index.category_counts[column][codes].sum()), scan, check
+
+
+def _range_step(index: ScreenerIndex, column: str, low, high) -> Step:
+    values = index.values[column]
+    sorted_values = index.sorted_values[column]
+    # Limites no mesmo tipo da coluna, como nas comparações do pandas
+    low = None if low is None else values.dtype.type(low)
+    high = None if high is None else values.dtype.type(high)
+
+    start = 0 if low is None else np.searchsorted(sorted_values, low, side="left")
+    if high is None:
+        stop = len(sorted_values) - np.count_nonzero(np.isnan(sorted_values))
+    else:
+        stop = np.searchsorted(sorted_values, high, side="right")
+    stop = max(start, stop)
+
+    def scan() -> np.ndarray:
+        return np.sort(index.order[column][start:stop])
+
+    def check(rows: np.ndarray) -> np.ndarray:
+        selected = values[rows]
+        mask = ~np.isnan(selected)
+        if low is not None:
+            mask &= selected >= low
+        if high is not None:
+            mask &= selected <= high
+        return rows[mask]
+
+    return int(stop - start), scan, check
+
+
+def plan(index: ScreenerIndex, predicates: list[tuple]) -> list[Step]:
+    """
+    Monta o plano de execução de um filtro.
+
+    Args:
+        index (ScreenerIndex): Índice dos dados.
+        predicates (list[tuple]): Predicados `(coluna, operador, valor)`; valores None são
+            ignorados.
+
+    Returns:
+        list[Step]: Passos do plano, do mais para o menos seletivo.
+    """
+    memberships: dict[str, set] = {}
+    ranges: dict[str, list] = {}
+
+    for column, operator, value in predicates:
+        if value is None:
+            continue
+        if operator not in OPERATORS:
+            raise ValueError(f"Operador inválido: {operator}")
+
+        if operator == "in":
+            memberships[column] = memberships.get(column, set(value)) & set(value)
+        else:
+            low, high = ranges.setdefault(column, [None, None])
+            if operator == ">=":
+                ranges[column][0] = value if low is None else max(low, value)
+            else:
+                ranges[column][1] = value if high is None else min(high, value)
+
+    steps = [_membership_step(index, column, values) for column, values in memberships.items()]
+    steps += [_range_step(index, column, low, high) for column, (low, high) in ranges.items()]
+    return sorted(steps, key=lambda step: step[0])
+
+
+def screen(
+    index: ScreenerIndex, predicates: list[tuple], rows: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Aplica um filtro sobre os dados indexados.
+
+    Args:
+        index (ScreenerIndex): Índice dos dados.
+        predicates (list[tuple]): Predicados `(coluna, operador, valor)`; valores None são
+            ignorados.
+        rows (np.ndarray | None): Posições candidatas em ordem crescente, por exemplo as linhas de
+            um preset; por padrão todas as linhas.
+
+    Returns:
+        np.ndarray: Posições das linhas selecionadas, na ordem original dos dados.
+    """
+    steps = plan(index, predicates)
+
+    if rows is None:
+        if not steps:
+            return np.arange(index.size)
+        estimated_rows, scan, _ = steps.pop(0)
+        rows = scan() if estimated_rows else np.empty(0, dtype=np.intp)
+
+    for _, _, check in steps:
+        if rows.size == 0:
+            break
+        rows = check(rows)
+
+    return rows
@@ -0,0 +1,271 @@
+"""
+Presets do screener escritos como expressões, por exemplo:
+
+    P/VP < 0.95 and Vacância < 10 and Segmento in ("Logística", "Lajes Corporativas")
+
+Cada expressão é compilada uma única vez em funções que operam sobre os arrays do ScreenerIndex.
+Todos os presets são avaliados juntos: subexpressões repetidas entre eles (como
+`Liquidez Diária > 1e6`) são calculadas uma única vez.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import operator
+import os
+import re
+from typing import Callable
+
+import numpy as np
+
+from config.settings import SCREENER_PRESETS_FILE
+from src.screener.index import ScreenerIndex, get_screener_index
+from src.utils.cache import register_cache
+from src.utils.data_version import get_current_version, get_version_key
+
+# Função compilada: recebe o dicionário de resultados já calculados e retorna um array
+Compiled = Callable[[dict], np.ndarray]
+
+COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+}
+STRING_LITERAL = re.compile(r"(\"[^\"]*\"|'[^']*')")
+
+_preset_rows = register_cache("get_preset_rows", maxsize=4)
+
+
+def _memoized(node: ast.AST, compute: Compiled) -> Compiled:
+    key = ast.dump(node)
+
+    def run(results: dict) -> np.ndarray:
+        if key not in results:
+            results[key] = compute(results)
+        return results[key]
+
+    return run
+
+
+class ExpressionCompiler:
+    """Compila expressões de filtro para funções vetorizadas sobre um ScreenerIndex."""
+
+    def __init__(self, index: ScreenerIndex):
+        self.index = index
+        columns = sorted([*index.codes, *index.values], key=len, reverse=True)
+        # Nomes de colunas têm espaços, barras e acentos: viram identificadores antes do parse
+        self.placeholders = {f"_c{i}": column for i, column in enumerate(columns)}
+        self.column_pattern = re.compile(
+            "|".join(rf"(?<!\w){re.escape(column)}(?!\w)" for column in columns)
+        )
+        self.placeholder_by_column = {column: name for name, column in self.placeholders.items()}
+
+    def compile(self, expression: str) -> Compiled:
+        """
+        Compila uma expressão de filtro.
+
+        Args:
+            expression (str): Expressão com comparações, `in`/`not in`, `and`, `or`, `not` e
+                aritmética entre colunas numéricas.
+
+        Returns:
+            Compiled: Função que retorna a máscara booleana das linhas selecionadas.
+        """
+        parts = STRING_LITERAL.split(expression)
+        for i in range(0, len(parts), 2):
+            parts[i] = self.column_pattern.sub(
+                lambda match: self.placeholder_by_column[match.group(0)], parts[i]
+            )
+
+        try:
+            tree = ast.parse("".join(parts).strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Expressão inválida: {expression}") from e
+
+        return self._condition(tree.body)
+
+    def _describe(self, node: ast.AST) -> str:
+        """Trecho da expressão com os nomes originais das colunas, para mensagens de erro."""
+        return re.sub(
+            r"_c\d+",
+            lambda match: self.placeholders.get(match.group(0), match.group(0)),
+            ast.unparse(node),
+        )
+
+    def _column(self, node: ast.AST) -> str | None:
+        if isinstance(node, ast.Name):
+            if node.id not in self.placeholders:
+                raise ValueError(f"Coluna desconhecida: {node.id}")
+            return self.placeholders[node.id]
+        return None
+
+    def _condition(self, node: ast.AST) -> Compiled:
+        if isinstance(node, ast.BoolOp):
+            operands = [self._condition(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+            def compute(results):
+                mask = operands[0](results)
+                for operand in operands[1:]:
+                    mask = combine(mask, operand(results))
+                return mask
+
+            return _memoized(node, compute)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self._condition(node.operand)
+            return _memoized(node, lambda results: ~operand(results))
+
+        if isinstance(node, ast.Compare):
+            # Comparações encadeadas (0.9 <= P/VP <= 1.05) viram uma conjunção de pares
+            nodes = [node.left, *node.comparators]
+            pairs = [
+                self._comparison(ast.Compare(left=nodes[i], ops=[op], comparators=[nodes[i + 1]]))
+                for i, op in enumerate(node.ops)
+            ]
+
+            def compute(results):
+                mask = pairs[0](results)
+                for pair in pairs[1:]:
+                    mask = mask & pair(results)
+                return mask
+
+            return _memoized(node, compute)
+
+        raise ValueError(f"Condição inválida: {self._describe(node)}")
+
+    def _comparison(self, node: ast.Compare) -> Compiled:
+        left, op, right = node.left, node.ops[0], node.comparators[0]
+        column = self._column(left)
+
+        if isinstance(op, (ast.In, ast.NotIn)):
+            if column is None or not isinstance(right, (ast.Tuple, ast.List, ast.Set)):
+                raise ValueError(f"Use `coluna in (valores)`: {self._describe(node)}")
+            values = [ast.literal_eval(element) for element in right.elts]
+            mask = self._membership(column, values)
+            if isinstance(op, ast.NotIn):
+                mask = ~mask
+            return _memoized(node, lambda results: mask)
+
+        if type(op) not in COMPARISONS:
+            raise ValueError(f"Comparação inválida: {self._describe(node)}")
+        compare = COMPARISONS[type(op)]
+
+        # Colunas categóricas aceitam apenas igualdade com um texto
+        categorical = column if column in self.index.codes else self._column(right)
+        if categorical in self.index.codes:
+            other = right if categorical == column else left
+            if not isinstance(op, (ast.Eq, ast.NotEq)) or not isinstance(other, ast.Constant):
+                raise ValueError(f"Comparação inválida: {self._describe(node)}")
+            mask = compare(self.index.codes[categorical], self._code(categorical, other.value))
+            return _memoized(node, lambda results: mask)
+
+        left_values = self._numeric(left, dtype_from=right)
+        right_values = self._numeric(right, dtype_from=left)
+        return _memoized(node, lambda results: compare(left_values(results), right_values(results)))
+
+    def _numeric(self, node: ast.AST, dtype_from: ast.AST | None = None) -> Compiled:
+        column = self._column(node)
+        if column is not None:
+            if column not in self.index.values:
+                raise ValueError(f"Coluna não numérica: {column}")
+            values = self.index.values[column]
+            return lambda results: values
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            # Constante comparada a uma coluna usa o tipo da coluna, como nas comparações do pandas
+            other = self._column(dtype_from) if dtype_from is not None else None
+            dtype = (
+                self.index.values[other].dtype
+                if other in self.index.values
+                else np.dtype("float64")
+            )
+            value = dtype.type(node.value)
+            return lambda results: value
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = self._numeric(node.operand)
+            return _memoized(node, lambda results: -operand(results))
+
+        if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC:
+            calculate = ARITHMETIC[type(node.op)]
+            left, right = self._numeric(node.left), self._numeric(node.right)
+            return _memoized(node, lambda results: calculate(left(results), right(results)))
+
+        raise ValueError(f"Valor inválido: {self._describe(node)}")
+
+    def _code(self, column: str, value) -> int:
+        codes = self.index.lookup_codes(column, [value])
+        # Valores inexistentes recebem um código que nenhuma linha tem
+        return int(codes[0]) if len(codes) else -2
+
+    def _membership(self, column: str, values: list) -> np.ndarray:
+        if column in self.index.codes:
+            table = np.zeros(len(self.index.categories[column]) + 1, dtype=bool)
+            table[self.index.lookup_codes(column, values)] = True
+            return table[self.index.codes[column]]
+        return np.isin(self.index.values[column], values)
+
+
+def load_presets() -> dict[str, str]:
+    """Carrega os presets do screener (nome -> expressão) do arquivo JSON de configuração."""
+    if not os.path.exists(SCREENER_PRESETS_FILE):
+        return {}
+    with open(SCREENER_PRESETS_FILE, "r") as f:
+        return json.load(f)
+
+
+def evaluate_presets(index: ScreenerIndex, presets: dict[str, str]) -> dict[str, np.ndarray]:
+    """
+    Compila e avalia todos os presets de uma vez, compartilhando as subexpressões repetidas.
+    Presets inválidos são registrados no log e ignorados.
+
+    Args:
+        index (ScreenerIndex): Índice dos dados.
+        presets (dict[str, str]): Presets no formato nome -> expressão.
+
+    Returns:
+        dict[str, np.ndarray]: Posições das linhas selecionadas por cada preset.
+    """
+    compiler = ExpressionCompiler(index)
+    compiled = {}
+    for name, expression in presets.items():
+        try:
+            compiled[name] = compiler.compile(expression)
+        except ValueError as e:
+            logging.warning(f"Preset '{name}' ignorado: {e}")
+
+    results: dict = {}
+    return {name: np.flatnonzero(evaluate(results)) for name, evaluate in compiled.items()}
+
+
+def get_preset_rows(version: str | None = None) -> dict[str, np.ndarray]:
+    """
+    Avalia os presets configurados sobre os dados de FIIs de uma versão. O resultado fica em cache
+    pela versão dos dados e pelo conteúdo dos presets, de modo que editar o arquivo de presets vale
+    na próxima execução da página.
+
+    Args:
+        version (str | None): Versão dos dados, por padrão a versão publicada atual.
+
+    Returns:
+        dict[str, np.ndarray]: Posições das linhas selecionadas por cada preset, na ordem de
+        `get_fiis_data(version)`.
+    """
+    version = version or get_current_version()
+    presets = load_presets()
+    presets_hash = hashlib.sha1(json.dumps(presets, sort_keys=True).encode()).hexdigest()
+    return _preset_rows.get_or_load(
+        f"{get_version_key(version)}:{presets_hash}",
+        lambda: evaluate_presets(get_screener_index(version), presets),
+    )
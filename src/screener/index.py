@@ -0,0 +1,82 @@
+"""
+Índice do screener: estruturas pré-calculadas uma vez por versão dos dados.
+
+Colunas categóricas são guardadas como códigos inteiros, e as numéricas como a ordem de
+classificação dos valores, para que os filtros de faixa sejam resolvidos por busca binária.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data import get_fiis_data
+from src.utils.cache import cached_by_version
+
+
+class ScreenerIndex:
+    """Códigos das colunas categóricas e valores ordenados das colunas numéricas de um DataFrame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.size = len(df)
+        self.codes: dict[str, np.ndarray] = {}
+        self.categories: dict[str, pd.Index] = {}
+        self.category_counts: dict[str, np.ndarray] = {}
+        self.values: dict[str, np.ndarray] = {}
+        self.order: dict[str, np.ndarray] = {}
+        self.sorted_values: dict[str, np.ndarray] = {}
+        # Colunas normalizadas pelo ranking, calculadas sob demanda
+        self.normalized: dict[tuple, np.ndarray] = {}
+
+        for column in df.columns:
+            series = df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                self.codes[column] = _read_only(codes)
+                self.categories[column] = series.cat.categories
+                # Contagem por categoria, usada para estimar a seletividade dos filtros
+                self.category_counts[column] = _read_only(
+                    np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+                )
+            elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(
+                series.dtype
+            ):
+                values = series.to_numpy(dtype=_numpy_dtype(series.dtype), na_value=np.nan)
+                order = np.argsort(values, kind="stable")
+                self.values[column] = _read_only(values)
+                self.order[column] = _read_only(order)
+                # Valores nulos ficam no final da ordenação e nunca entram em uma faixa
+                self.sorted_values[column] = _read_only(values[order])
+
+    def lookup_codes(self, column: str, values) -> np.ndarray:
+        """Converte valores de uma coluna categórica em seus códigos, ignorando os inexistentes."""
+        codes = self.categories[column].get_indexer(list(values))
+        return codes[codes >= 0]
+
+    def unique(self, column: str, rows: np.ndarray | None = None) -> list:
+        """Retorna os valores presentes em uma coluna categórica, ou apenas nas linhas `rows`."""
+        codes = self.codes[column] if rows is None else self.codes[column][rows]
+        present = np.unique(codes[codes >= 0])
+        return list(self.categories[column][present])
+
+
+def _numpy_dtype(dtype) -> np.dtype:
+    """Tipo numpy usado para as comparações: float32 é mantido, os demais viram float64."""
+    return np.dtype("float32") if dtype == np.float32 else np.dtype("float64")
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+@cached_by_version()
+def get_screener_index(version: str | None = None) -> ScreenerIndex:
+    """
+    Monta o índice do screener sobre os dados de FIIs de uma versão.
+
+    Args:
+        version (str | None): Versão dos dados, por padrão a versão publicada atual.
+
+    Returns:
+        ScreenerIndex: Índice dos dados de FIIs, na mesma ordem de `get_fiis_data(version)`.
+    """
+    return ScreenerIndex(get_fiis_data(version))
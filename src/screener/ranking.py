@@ -0,0 +1,155 @@
+"""
+Ranking multifator dos FIIs.
+
+Cada fator é uma coluna numérica normalizada por posição (rank), z-score ou percentil, no total
+ou dentro de cada segmento. A nota de um FII é a soma ponderada dos fatores normalizados; as
+normalizações ficam guardadas no índice, então trocar os pesos não refaz nenhum cálculo pesado.
+"""
+
+import numpy as np
+
+from src.screener.index import ScreenerIndex
+
+GROUP_COLUMN = "Segmento"
+
+
+def _group_ids(index: ScreenerIndex, by_segment: bool) -> np.ndarray:
+    if not by_segment:
+        return np.zeros(index.size, dtype=np.intp)
+    # Código -1 (segmento nulo) vira um grupo próprio
+    return index.codes[GROUP_COLUMN].astype(np.intp) + 1
+
+
+def _average_rank(values: np.ndarray, groups: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Posição média de cada valor dentro do seu grupo (empates recebem a média das posições, como em
+    `pd.Series.rank`) e a quantidade de valores válidos do grupo. Valores nulos ficam como NaN.
+    """
+    ranks = np.full(len(values), np.nan)
+    counts = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size == 0:
+        return ranks, counts
+
+    order = valid[np.lexsort((values[valid], groups[valid]))]
+    sorted_values, sorted_groups = values[order], groups[order]
+
+    new_group = np.r_[True, sorted_groups[1:] != sorted_groups[:-1]]
+    new_value = new_group | np.r_[True, sorted_values[1:] != sorted_values[:-1]]
+
+    group_starts = np.flatnonzero(new_group)
+    group_sizes = np.diff(np.r_[group_starts, order.size])
+    group_of = np.cumsum(new_group) - 1
+
+    tie_starts = np.flatnonzero(new_value)
+    tie_ends = np.r_[tie_starts[1:], order.size]
+    tie_of = np.cumsum(new_value) - 1
+    average_position = (tie_starts + tie_ends - 1) / 2
+
+    ranks[order] = average_position[tie_of] - group_starts[group_of] + 1
+    counts[order] = group_sizes[group_of]
+    return ranks, counts
+
+
+def _zscore(values: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    counts = np.bincount(groups, weights=valid, minlength=groups.max() + 1)
+    sums = np.bincount(groups, weights=filled, minlength=groups.max() + 1)
+    squares = np.bincount(groups, weights=filled**2, minlength=groups.max() + 1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        stds = np.sqrt(np.maximum(squares / counts - means**2, 0.0))
+        scores = (values - means[groups]) / stds[groups]
+
+    # Grupos sem variação não diferenciam os FIIs
+    return np.where(valid & (stds[groups] == 0), 0.0, scores)
+
+
+def normalize(
+    index: ScreenerIndex, column: str, method: str = "rank", by_segment: bool = False
+) -> np.ndarray:
+    """
+    Normaliza uma coluna numérica do índice, com o resultado guardado no próprio índice.
+
+    Args:
+        index (ScreenerIndex): Índice dos dados.
+        column (str): Coluna numérica a ser normalizada.
+        method (str): "rank" (posição, maior valor = maior posição), "zscore" ou "percentile".
+        by_segment (bool): Normaliza dentro de cada segmento em vez de no total.
+
+    Returns:
+        np.ndarray: Valores normalizados, NaN onde a coluna é nula.
+    """
+    key = (column, method, by_segment)
+    if key in index.normalized:
+        return index.normalized[key]
+
+    values = index.values[column].astype(np.float64)
+    groups = _group_ids(index, by_segment)
+
+    if method == "rank":
+        normalized, _ = _average_rank(values, groups)
+    elif method == "percentile":
+        ranks, counts = _average_rank(values, groups)
+        normalized = ranks / counts * 100
+    elif method == "zscore":
+        normalized = _zscore(values, groups)
+    else:
+        raise ValueError(f"Método de normalização inválido: {method}")
+
+    normalized.flags.writeable = False
+    index.normalized[key] = normalized
+    return normalized
+
+
+def score(
+    index: ScreenerIndex,
+    weights: dict[str, float],
+    method: str = "rank",
+    by_segment: bool = False,
+) -> np.ndarray:
+    """
+    Calcula a nota de cada FII como a soma ponderada dos fatores normalizados.
+
+    Args:
+        index (ScreenerIndex): Índice dos dados.
+        weights (dict[str, float]): Peso de cada coluna; negativo quando valores menores são
+            melhores. Colunas com peso zero são ignoradas.
+        method (str): Normalização dos fatores, ver `normalize`.
+        by_segment (bool): Normaliza os fatores dentro de cada segmento.
+
+    Returns:
+        np.ndarray: Nota de cada linha (maior é melhor), NaN se algum fator usado for nulo.
+    """
+    scores = np.zeros(index.size)
+    for column, weight in weights.items():
+        if weight:
+            scores += weight * normalize(index, column, method, by_segment)
+    return scores
+
+
+def top_k(scores: np.ndarray, k: int | None = None, rows: np.ndarray | None = None) -> np.ndarray:
+    """
+    Seleciona as linhas de maior nota, em ordem decrescente de nota. Notas nulas ficam por último;
+    empates mantêm a ordem original dos dados.
+
+    Args:
+        scores (np.ndarray): Nota de cada linha.
+        k (int | None): Quantidade de linhas, por padrão todas.
+        rows (np.ndarray | None): Posições candidatas, por exemplo o resultado do screener.
+
+    Returns:
+        np.ndarray: Posições das k melhores linhas.
+    """
+    rows = np.arange(len(scores)) if rows is None else np.asarray(rows)
+    keys = -np.nan_to_num(scores[rows], nan=-np.inf)
+
+    if k is not None and k < rows.size:
+        # Seleção parcial O(n); apenas as k escolhidas são ordenadas
+        selected = np.argpartition(keys, k - 1)[:k]
+        selected = np.sort(selected)
+        rows, keys = rows[selected], keys[selected]
+
+    return rows[np.argsort(keys, kind="stable")]
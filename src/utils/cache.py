@@ -0,0 +1,136 @@
+"""
+Cache em memória dos carregadores de dados, chaveado pela versão publicada dos dados.
+
+Quando um scrape publica uma nova versão, a chave muda e os dados são recarregados na próxima
+chamada; versões antigas saem do cache por ordem de uso (LRU). Sessões que pedem a mesma versão
+ao mesmo tempo compartilham uma única carga (single-flight).
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+import pandas as pd
+
+from src.utils.data_version import get_current_version, get_version_key
+
+_caches: dict[str, "VersionedCache"] = {}
+
+
+class VersionedCache:
+    """Cache LRU de tamanho limitado, com contagem de acertos, falhas e cargas compartilhadas."""
+
+    def __init__(self, name: str, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self._data: OrderedDict = OrderedDict()
+        self._loading: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: str, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Retorna o valor da chave, carregando-o com `loader` caso não esteja no cache. Se a chave já
+        estiver sendo carregada por outra thread, aguarda e retorna o resultado dessa carga.
+        """
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+
+            future = self._loading.get(key)
+            is_loader = future is None
+            if is_loader:
+                self.misses += 1
+                future = self._loading[key] = Future()
+            else:
+                self.shared += 1
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            del self._loading[key]
+        future.set_result(value)
+
+        return value
+
+    def info(self) -> dict:
+        """Retorna as estatísticas de uso do cache."""
+        total = self.hits + self.misses + self.shared
+        return {
+            "Cache": self.name,
+            "Acertos": self.hits,
+            "Falhas": self.misses,
+            "Cargas Compartilhadas": self.shared,
+            "Taxa de Acerto": self.hits / total * 100 if total else 0.0,
+            "Itens": len(self._data),
+            "Tamanho Máximo": self.maxsize,
+        }
+
+    def clear(self) -> None:
+        """Esvazia o cache e zera as estatísticas."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.shared = 0
+
+
+def register_cache(name: str, maxsize: int) -> VersionedCache:
+    """Cria um cache com o nome informado e o inclui nas estatísticas de `get_cache_stats`."""
+    cache = _caches[name] = VersionedCache(name, maxsize)
+    return cache
+
+
+def cached_by_version(maxsize: int = 4):
+    """
+    Decorador para carregadores de dados no formato `loader(version) -> pd.DataFrame`. Outros
+    objetos também podem ser cacheados, mas são compartilhados sem cópia e não devem ser alterados.
+
+    A versão é resolvida uma única vez por chamada e usada tanto como chave do cache quanto como
+    versão lida pelo carregador. Cada chamada recebe uma cópia do DataFrame compartilhado: rasa
+    quando o copy-on-write do pandas está ativo, como nas páginas do app, e completa nos demais
+    casos, para que alterações nunca cheguem ao cache.
+
+    Args:
+        maxsize (int): Quantidade máxima de versões mantidas em memória.
+    """
+
+    def decorator(loader: Callable[[str | None], pd.DataFrame]):
+        cache = register_cache(loader.__name__, maxsize)
+
+        @functools.wraps(loader)
+        def wrapper(version: str | None = None) -> pd.DataFrame:
+            version = version or get_current_version()
+            value = cache.get_or_load(get_version_key(version), lambda: loader(version))
+            if isinstance(value, pd.DataFrame):
+                return value.copy(deep=not pd.get_option("mode.copy_on_write"))
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats() -> pd.DataFrame:
+    """Retorna as estatísticas de todos os caches de dados."""
+    return pd.DataFrame([cache.info() for cache in _caches.values()])
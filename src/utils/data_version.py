@@ -0,0 +1,175 @@
+"""
+Publicação versionada dos arquivos de dados.
+
+Cada execução dos scrapes escreve seus arquivos em um diretório de versão novo
+(downloads/versions/<versão>) e só então publica essa versão trocando o ponteiro
+downloads/CURRENT com um rename atômico. Leitores resolvem a versão atual uma única vez e leem
+todos os arquivos dela, sem locks e sem nunca ver um arquivo pela metade.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+
+from config.settings import (
+    COMMUNICATIONS_FILE,
+    CURRENT_VERSION_FILE,
+    DATA_VERSIONS_DIR,
+    DATA_VERSIONS_TO_KEEP,
+    FUNDAMENTUS_FILE,
+    INVESTIDOR10_FILE,
+    WARD_FILE,
+)
+
+log_format = "%(asctime)s - %(levelname)s - %(message)s"
+logging.basicConfig(format=log_format, level=logging.INFO)
+
+# Arquivos escritos diretamente em downloads/ antes da publicação versionada
+LEGACY_DATA_FILES = [INVESTIDOR10_FILE, FUNDAMENTUS_FILE, COMMUNICATIONS_FILE, WARD_FILE]
+
+
+def get_current_version() -> str | None:
+    """Retorna a versão publicada atualmente, ou None caso nenhuma versão tenha sido publicada."""
+    try:
+        with open(CURRENT_VERSION_FILE, "r") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def get_version_key(version: str | None) -> str:
+    """
+    Retorna uma chave que identifica os dados de uma versão, para uso em caches. Sem versão
+    publicada, a chave é formada pelas datas de modificação dos arquivos legados.
+    """
+    if version is not None:
+        return version
+    mtimes = [str(os.stat(path).st_mtime_ns) for path in LEGACY_DATA_FILES if os.path.exists(path)]
+    return "legacy-" + "-".join(mtimes)
+
+
+def get_version_dir(version: str) -> str:
+    """Retorna o diretório de uma versão."""
+    return os.path.join(DATA_VERSIONS_DIR, version)
+
+
+def resolve_data_file(file_path: str, version: str | None) -> str:
+    """
+    Resolve o caminho de um arquivo de dados dentro de uma versão.
+
+    Args:
+        file_path (str): Caminho lógico do arquivo, por exemplo INVESTIDOR10_FILE.
+        version (str | None): Versão fixada pelo leitor; None usa o caminho legado em downloads/.
+
+    Returns:
+        str: Caminho físico do arquivo.
+    """
+    if version is None:
+        return file_path
+    return os.path.join(get_version_dir(version), os.path.basename(file_path))
+
+
+def _carry_forward(
+    staging_dir: str, base_version: str | None, file_paths: list[str] | None = None
+) -> None:
+    """
+    Traz para a nova versão os arquivos da versão base que não foram reescritos, ou apenas os de
+    `file_paths`, se informados.
+    """
+    if base_version is None:
+        base_files = [path for path in LEGACY_DATA_FILES if os.path.exists(path)]
+    else:
+        base_dir = get_version_dir(base_version)
+        base_files = [os.path.join(base_dir, name) for name in os.listdir(base_dir)]
+
+    if file_paths is not None:
+        names = {os.path.basename(path) for path in file_paths}
+        base_files = [path for path in base_files if os.path.basename(path) in names]
+
+    for base_file in base_files:
+        target = os.path.join(staging_dir, os.path.basename(base_file))
+        if os.path.exists(target):
+            continue
+        try:
+            # Arquivos de versões publicadas nunca são alterados, então podem ser compartilhados
+            os.link(base_file, target)
+        except OSError:
+            shutil.copy2(base_file, target)
+
+
+def stage_files(staging_dir: str, file_paths: list[str]) -> str:
+    """
+    Traz para o staging os arquivos da versão atual que ainda não foram escritos nesta execução,
+    para que a versão possa ser lida antes de publicada.
+
+    Os arquivos trazidos são compartilhados com a versão atual e não devem ser alterados.
+
+    Args:
+        staging_dir (str): Diretório de staging de uma versão aberta com `staged_version`.
+        file_paths (list[str]): Caminhos lógicos dos arquivos a serem lidos.
+
+    Returns:
+        str: Identificador do staging, para ler os arquivos com `resolve_data_file`.
+    """
+    _carry_forward(staging_dir, get_current_version(), file_paths)
+    return os.path.basename(staging_dir)
+
+
+def _prune_versions(current_version: str) -> None:
+    """Remove as versões mais antigas, mantendo as DATA_VERSIONS_TO_KEEP mais recentes."""
+    versions = sorted(name for name in os.listdir(DATA_VERSIONS_DIR) if not name.startswith("."))
+    for version in versions[:-DATA_VERSIONS_TO_KEEP]:
+        if version != current_version:
+            shutil.rmtree(get_version_dir(version), ignore_errors=True)
+
+
+def publish_version(staging_dir: str) -> str:
+    """
+    Publica um diretório de staging como a nova versão atual.
+
+    Args:
+        staging_dir (str): Diretório com os arquivos escritos nesta execução.
+
+    Returns:
+        str: Identificador da versão publicada.
+    """
+    _carry_forward(staging_dir, get_current_version())
+
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    os.rename(staging_dir, get_version_dir(version))
+
+    tmp_pointer = f"{CURRENT_VERSION_FILE}.{version}.tmp"
+    with open(tmp_pointer, "w") as f:
+        f.write(version)
+    os.replace(tmp_pointer, CURRENT_VERSION_FILE)
+
+    _prune_versions(version)
+
+    logging.info(f"✓ Versão de dados {version} publicada!")
+    return version
+
+
+@contextmanager
+def staged_version() -> Iterator[str]:
+    """
+    Abre um diretório de staging para escrever uma nova versão dos dados.
+
+    A versão é publicada ao final do bloco; se ocorrer um erro, o staging é descartado e a versão
+    atual continua intacta.
+
+    Yields:
+        str: Caminho do diretório de staging.
+    """
+    os.makedirs(DATA_VERSIONS_DIR, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=DATA_VERSIONS_DIR)
+    try:
+        yield staging_dir
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    publish_version(staging_dir)
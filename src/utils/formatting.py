@@ -0,0 +1,48 @@
+"""
+Formatos de exibição das colunas numéricas das tabelas.
+
+As tabelas continuam numéricas, para que a ordenação pelo cabeçalho compare números, e a
+formatação é feita no navegador pelas colunas do `st.dataframe` (`NumberColumn`): nenhuma função
+Python roda por célula e o pandas não precisa renderizar a tabela.
+"""
+
+import pandas as pd
+import streamlit as st
+
+from config.settings import (
+    BIG_MONEY_COLS,
+    FLOAT_COLS,
+    INT_COLS,
+    MONEY_COLS,
+    PERCENT_COLS,
+    SEGMENT_PERCENTILE_COLS,
+)
+
+# Formato de exibição de cada coluna, no padrão printf do `NumberColumn`
+DISPLAY_FORMATS = {
+    **{col: "%.2f%%" for col in PERCENT_COLS},
+    **{col: "R$ %.2f" for col in MONEY_COLS},
+    **{col: "R$ %.0f" for col in BIG_MONEY_COLS},
+    **{col: "%.2f" for col in FLOAT_COLS},
+    **{col: "%.0f" for col in INT_COLS},
+    **{col: "%.0f" for col in SEGMENT_PERCENTILE_COLS},
+}
+
+
+def get_number_columns(df: pd.DataFrame, formats: dict[str, str]) -> dict:
+    """
+    Monta a configuração das colunas de `formats` presentes no DataFrame, para o `column_config`
+    do `st.dataframe`.
+
+    Args:
+        df (pd.DataFrame): DataFrame a ser exibido, com as colunas numéricas.
+        formats (dict[str, str]): Coluna -> formato printf, por exemplo "R$ %.2f".
+
+    Returns:
+        dict: Coluna -> `st.column_config.NumberColumn` com o formato da coluna.
+    """
+    return {
+        column: st.column_config.NumberColumn(column, format=column_format)
+        for column, column_format in formats.items()
+        if column in df.columns
+    }
@@ -1,23 +1,41 @@
-import pandas as pd
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
 
-from src.data import get_communications_data, get_fiis_data
+from config.settings import COMMUNICATIONS_FILE, INVESTIDOR10_FILE
+from src.utils.data_version import get_current_version, resolve_data_file
+from src.utils.manifest import load_manifest
 
 
-def get_last_update_date(
-    fiis_data: pd.DataFrame = get_fiis_data(),
-    communications_data: pd.DataFrame = get_communications_data(),
-) -> str:
+def _get_file_update_date(file_path: str, manifest: dict, version: str | None) -> datetime | None:
     """
-    Obtém a data da última atualização dos dados dos FIIs e comunicados.
+    Obtém a data de atualização de um arquivo de dados pelo manifesto ou, para dados escritos
+    antes do manifesto existir, pela data de modificação do arquivo.
     """
-    fiis_date = (
-        fiis_data["Data Atualização"].min().strftime("%d/%m/%Y %Hh%Mmin")
-        if not fiis_data.empty
-        else "-"
-    )
-    communications_date = (
-        communications_data["Data Atualização"].min().strftime("%d/%m/%Y %Hh%Mmin")
-        if not communications_data.empty
-        else "-"
-    )
-    return min(fiis_date, communications_date)
+    file_name = os.path.basename(file_path)
+    if file_name in manifest:
+        return datetime.fromisoformat(manifest[file_name]["updated_at"])
+
+    path = resolve_data_file(file_path, version)
+    if os.path.exists(path):
+        return datetime.fromtimestamp(os.path.getmtime(path)).astimezone()
+    return None
+
+
+def get_last_update_date() -> str:
+    """
+    Obtém a data da última atualização dos dados dos FIIs e comunicados, a partir do manifesto
+    da versão atual dos dados (sem carregar os dados).
+    """
+    version = get_current_version()
+    manifest = load_manifest(version)
+
+    dates = [
+        _get_file_update_date(file_path, manifest, version)
+        for file_path in [INVESTIDOR10_FILE, COMMUNICATIONS_FILE]
+    ]
+    dates = [date for date in dates if date is not None]
+    if not dates:
+        return "-"
+
+    return min(dates).astimezone(ZoneInfo("America/Sao_Paulo")).strftime("%d/%m/%Y %Hh%Mmin")
@@ -4,6 +4,7 @@ import os
 import pandas as pd
 
 from config.settings import INVESTIDOR10_FILE, MY_FIIS_FILE, WANTED_FIIS_FILE
+from src.utils.data_version import get_current_version, resolve_data_file
 
 
 def get_my_tickers():
@@ -26,25 +27,23 @@ def get_wanted_tickers():
     return set()
 
 
-def get_tickers_with_cnpj():
-    """Retorna um dicionário com ticker: CNPJ para todos os FIIs cadastrados (meus + desejados)"""
+def get_tickers_with_cnpj(version_dir: str | None = None):
+    """
+    Retorna um dicionário com ticker: CNPJ para todos os FIIs cadastrados (meus + desejados)
+
+    Args:
+        version_dir (str | None): Diretório de uma versão em staging de onde ler o CSV do
+            Investidor10. Se não informado, usa a versão publicada atual.
+    """
     tickers_dict = {}
 
     # Busca CNPJs do arquivo CSV do investidor10
-    # Tenta diferentes caminhos possíveis
-    possible_paths = [
-        INVESTIDOR10_FILE,
-        os.path.join(os.path.dirname(os.path.dirname(__file__)), INVESTIDOR10_FILE),
-        os.path.join(os.getcwd(), INVESTIDOR10_FILE),
-    ]
-
-    investidor10_file = None
-    for path in possible_paths:
-        if os.path.exists(path):
-            investidor10_file = path
-            break
+    if version_dir:
+        investidor10_file = os.path.join(version_dir, os.path.basename(INVESTIDOR10_FILE))
+    else:
+        investidor10_file = resolve_data_file(INVESTIDOR10_FILE, get_current_version())
 
-    if investidor10_file:
+    if os.path.exists(investidor10_file):
         try:
             df = pd.read_csv(investidor10_file)
             if "CNPJ" in df.columns and "Ticker" in df.columns:
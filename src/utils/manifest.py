@@ -0,0 +1,61 @@
+"""
+Manifesto de atualização dos dados.
+
+Cada versão dos dados carrega um pequeno manifest.json com, para cada arquivo escrito pelos scrapes,
+o momento da última escrita bem-sucedida, a quantidade de linhas e a duração do scrape. A barra
+lateral das páginas lê apenas esse arquivo, sem carregar os dados.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from config.settings import MANIFEST_FILE
+from src.utils.data_version import get_current_version, resolve_data_file
+
+
+def load_manifest(version: str | None = None) -> dict:
+    """
+    Carrega o manifesto de uma versão dos dados.
+
+    Args:
+        version (str | None): Versão dos dados, por padrão a versão publicada atual.
+
+    Returns:
+        dict: Dicionário arquivo -> {"updated_at", "rows", "duration_seconds"}.
+    """
+    manifest_path = resolve_data_file(MANIFEST_FILE, version or get_current_version())
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def update_manifest(
+    version_dir: str, file_path: str, rows: int, duration: float | None = None
+) -> None:
+    """
+    Registra no manifesto da versão em staging a escrita de um arquivo de dados.
+
+    Args:
+        version_dir (str): Diretório de staging da versão.
+        file_path (str): Caminho lógico do arquivo escrito, por exemplo INVESTIDOR10_FILE.
+        rows (int): Quantidade de linhas escritas.
+        duration (float | None): Duração do scrape em segundos, se conhecida.
+    """
+    manifest_path = os.path.join(version_dir, os.path.basename(MANIFEST_FILE))
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+    else:
+        manifest = load_manifest()
+
+    manifest[os.path.basename(file_path)] = {
+        "updated_at": datetime.now().astimezone().isoformat(),
+        "rows": rows,
+        "duration_seconds": round(duration, 2) if duration is not None else None,
+    }
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
@@ -3,7 +3,10 @@ import os
 
 import pandas as pd
 
-from config.settings import DOWNLOADS_DIR, PROJECT_ROOT
+from config.settings import DOWNLOADS_DIR, PROJECT_ROOT, QUARANTINE_FILE
+from src.schema import coerce_numeric
+from src.utils.data_version import get_current_version, resolve_data_file, staged_version
+from src.utils.manifest import update_manifest
 
 log_format = "%(asctime)s - %(levelname)s - %(message)s"
 logging.basicConfig(format=log_format, level=logging.INFO)
@@ -18,30 +21,85 @@ def ensure_downloads_folder() -> None:
         logging.info(f'Pasta "downloads" criada em: {downloads_path}')
 
 
-def write_csv_file(data: pd.DataFrame, file_path: str, mode: str = "w") -> None:
+def update_quarantine(version_dir: str, file_path: str, quarantine: pd.DataFrame) -> None:
     """
-    Escreve um arquivo CSV com os dados fornecidos, escrita feita na pasta downloads.
+    Atualiza o relatório de quarentena da versão em staging com os valores inválidos de um arquivo,
+    substituindo os registros anteriores desse arquivo.
+
+    Args:
+        version_dir (str): Diretório de staging da versão.
+        file_path (str): Caminho lógico do arquivo escrito.
+        quarantine (pd.DataFrame): Valores inválidos encontrados no arquivo.
+    """
+    report_path = os.path.join(version_dir, os.path.basename(QUARANTINE_FILE))
+    existing_path = report_path
+    if not os.path.exists(existing_path):
+        existing_path = resolve_data_file(QUARANTINE_FILE, get_current_version())
+
+    if not os.path.exists(existing_path) and quarantine.empty:
+        return
+
+    report = pd.read_csv(existing_path) if os.path.exists(existing_path) else quarantine.iloc[0:0]
+    report = report[report["Arquivo"] != os.path.basename(file_path)]
+    report = pd.concat([report, quarantine], ignore_index=True)
+    report.to_csv(report_path, index=False)
+
+
+def write_csv_file(
+    data: pd.DataFrame,
+    file_path: str,
+    mode: str = "w",
+    version_dir: str | None = None,
+    duration: float | None = None,
+) -> None:
+    """
+    Escreve um arquivo CSV com os dados fornecidos, escrita feita em uma nova versão dos dados.
 
     Args:
         data (pd.DataFrame): DataFrame contendo os dados.
-        file_path (str): Caminho completo do arquivo CSV.
+        file_path (str): Caminho lógico do arquivo CSV, por exemplo INVESTIDOR10_FILE.
         mode (str): Modo de escrita - 'w' para overwrite (padrão) ou 'a' para append.
+        version_dir (str | None): Diretório de staging de uma versão aberta com `staged_version`.
+            Se não informado, o arquivo é publicado sozinho em uma nova versão.
+        duration (float | None): Duração do scrape em segundos, registrada no manifesto.
     """
     ensure_downloads_folder()
 
+    if version_dir is None:
+        with staged_version() as version_dir:
+            write_csv_file(
+                data=data,
+                file_path=file_path,
+                mode=mode,
+                version_dir=version_dir,
+                duration=duration,
+            )
+        return
+
+    # Valores que não respeitam o schema são anulados e registrados na quarentena
+    data, quarantine = coerce_numeric(data, os.path.basename(file_path))
+    update_quarantine(version_dir, file_path, quarantine)
+
     # Calcula o caminho relativo a partir do PROJECT_ROOT para o log
     relative_path = os.path.relpath(file_path, PROJECT_ROOT)
+    target_path = os.path.join(version_dir, os.path.basename(file_path))
+
+    existing_path = target_path
+    if not os.path.exists(existing_path):
+        existing_path = resolve_data_file(file_path, get_current_version())
 
-    if mode == "a" and os.path.exists(file_path):
+    if mode == "a" and os.path.exists(existing_path):
         # Modo append: lê o arquivo existente e concatena com os novos dados
-        existing_data = pd.read_csv(file_path)
+        existing_data = pd.read_csv(existing_path)
         # Remove duplicatas baseado em todas as colunas (exceto 'Data Atualização' se existir)
         combined_data = pd.concat([existing_data, data], ignore_index=True)
         # Remove duplicatas completas mantendo a última ocorrência
         combined_data = combined_data.drop_duplicates(keep="last")
-        combined_data.to_csv(file_path, index=False)
+        combined_data.to_csv(target_path, index=False)
+        update_manifest(version_dir, file_path, rows=len(combined_data), duration=duration)
         logging.info(f"✓ Arquivo {relative_path} atualizado (append) com sucesso!")
     else:
         # Modo overwrite: escreve o arquivo normalmente
-        data.to_csv(file_path, index=False)
+        data.to_csv(target_path, index=False)
+        update_manifest(version_dir, file_path, rows=len(data), duration=duration)
         logging.info(f"✓ Arquivo {relative_path} escrito com sucesso!")